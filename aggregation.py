@@ -0,0 +1,86 @@
+from typing import Optional
+
+import pandas as pd
+
+from config import VIZ_SETTINGS
+
+REDUCERS = ["sum", "mean", "count", "median", "min", "max"]
+
+
+def _is_measure(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+
+
+def fold_partials(partials: pd.DataFrame, reducer: str, top_n: Optional[int],
+                  other_label: str = "Other") -> pd.DataFrame:
+    """Reduce per-category partial aggregates and fold the tail into one row.
+
+    ``partials`` is indexed by category and holds 'sum' and 'count' columns
+    (and 'min'/'max' when those reducers are used). Returns a frame with a
+    'value' column sorted in descending order, keeping the ``top_n`` largest
+    categories plus an ``other_label`` row for the rest.
+    """
+    if reducer == "mean":
+        values = partials["sum"] / partials["count"]
+    else:
+        values = partials[reducer]
+    order = values.sort_values(ascending=False, na_position="last").index
+
+    head, tail = order, order[:0]
+    if top_n is not None and len(order) > top_n:
+        head, tail = order[:top_n], order[top_n:]
+
+    result = pd.DataFrame({"value": values.loc[head]})
+    if len(tail):
+        rest = partials.loc[tail]
+        if reducer == "mean":
+            other = rest["sum"].sum() / rest["count"].sum()
+        elif reducer == "min":
+            other = rest["min"].min()
+        elif reducer == "max":
+            other = rest["max"].max()
+        else:
+            other = rest[reducer].sum()
+        result = pd.concat([result, pd.DataFrame({"value": [other]}, index=[other_label])])
+    return result
+
+
+def aggregate_by_category(df: pd.DataFrame, category_col: str, value_col: str,
+                          reducer: str = "sum", top_n: Optional[int] = None,
+                          other_label: str = "Other") -> pd.DataFrame:
+    """Group ``df`` by ``category_col`` and reduce ``value_col`` per category.
+
+    Returns one row per category (at most ``top_n`` plus an ``other_label``
+    row) with the category in the first column and the reduced value in the
+    second, named after ``value_col`` (or ``"<reducer> of <value_col>"`` when
+    both inputs are the same column). Non-numeric value columns can only be
+    counted, so any other reducer falls back to 'count' for them.
+    """
+    if reducer not in REDUCERS:
+        raise ValueError(f"Unsupported reducer: {reducer}")
+    if top_n is None:
+        top_n = VIZ_SETTINGS["aggregate_top_n"]
+    if not _is_measure(df[value_col]):
+        reducer = "count"
+
+    grouped = df.groupby(category_col, observed=True, dropna=False, sort=False)[value_col]
+    if reducer == "median":
+        medians = grouped.median()
+        order = medians.sort_values(ascending=False, na_position="last").index
+        result = pd.DataFrame({"value": medians.loc[order[:top_n]]})
+        if len(order) > top_n:
+            # Medians cannot be combined, so the tail is reduced from its rows
+            tail_rows = df[category_col].isin(order[top_n:])
+            other = df.loc[tail_rows, value_col].median()
+            result = pd.concat([result, pd.DataFrame({"value": [other]}, index=[other_label])])
+    else:
+        partials = pd.DataFrame({"count": grouped.count()})
+        if reducer in ("sum", "mean"):
+            partials["sum"] = grouped.sum()
+        elif reducer != "count":
+            partials[reducer] = getattr(grouped, reducer)()
+        result = fold_partials(partials, reducer, top_n, other_label)
+
+    value_name = value_col if value_col != category_col else f"{reducer} of {value_col}"
+    result.index = pd.Index(result.index.astype(object), name=category_col)
+    return result.rename(columns={"value": value_name}).reset_index()
@@ -1,30 +1,12 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import seaborn as sns
-import altair as alt
-import matplotlib.pyplot as plt
-import bcrypt
-import json
-from pathlib import Path
-import os
-from datetime import datetime
-import base64
-from PIL import Image
-import requests
-from io import BytesIO
-from utils import (
-    clean_data,
-    compare_datasets,
-    create_line_chart,
-    create_bar_chart,
-    create_pie_chart,
-    create_heatmap,
-    get_download_link,
-    apply_filters
-)
+from config import COMPARISON_SETTINGS, DEFAULT_DATASET, FILTER_SETTINGS, UPLOAD_SETTINGS
+from assets import get_logo
+from instrumentation import page_timer, stage
+from lazy import lazy_module
+
+# Data libraries and modules are imported on first use, so the login
+# screen renders without loading pandas, plotly or pyarrow
+px = lazy_module("plotly.express")
 
 # Page configuration
 st.set_page_config(
@@ -35,33 +17,58 @@ st.set_page_config(
 
 st.title("📊 Data Analysis Dashboard")
 
-# File uploader
-uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
+# File uploader; it loads the whole file into memory, so it keeps Streamlit's default 200MB
+# limit and larger CSVs are left to the Static Data page, which streams them
+quick_max_file_size = UPLOAD_SETTINGS["quick_max_file_size"]
+uploaded_file = st.file_uploader("Choose a CSV file", type="csv",
+                                 max_upload_size=quick_max_file_size // (1024 * 1024))
+if uploaded_file is not None and uploaded_file.size > quick_max_file_size:
+    st.error(f"{uploaded_file.name} exceeds the {quick_max_file_size // (1024 * 1024)} MB limit of this uploader; "
+             "use the Static Data page for larger CSV files.")
+    uploaded_file = None
 
 if uploaded_file is not None:
-    # Read the data
-    df = pd.read_csv(uploaded_file)
+    from aggregation import REDUCERS
+    from cache import load_uploaded_file
+    from correlation import METHODS
+    from export import FORMATS, read_export
+    from figure_cache import cached_figure
+    from filters import build_mask_cached, filter_state_key
+    from utils import apply_filters, create_bar_chart, create_heatmap, create_line_chart, create_pie_chart
+    from value_index import get_value_index
     
-    # Clean the data
-    df = clean_data(df)
+    # Read and clean the data (cached by content hash across reruns)
+    df, dataset_key = load_uploaded_file(uploaded_file, clean=True)
     
-    # Sidebar filters
+    # Sidebar filters, with options read from the dataset's value index
     st.sidebar.header("Filters")
     filters = {}
+    index = get_value_index(df, dataset_key)
     
-    for column in df.columns:
-        if df[column].dtype == 'object':
-            unique_values = df[column].unique()
+    for column, column_index in index.items():
+        if len(column_index) <= FILTER_SETTINGS["max_multiselect_options"]:
+            selected_values = st.sidebar.multiselect(
+                f"Select {column}",
+                options=column_index.values,
+                default=column_index.values
+            )
+        else:
+            # High-cardinality columns only send the values matching a search
+            widget_key = f"filter_{dataset_key}_{column}"
+            search = st.sidebar.text_input(f"Search {column}", key=f"{widget_key}_search")
+            matches = column_index.search(search, FILTER_SETTINGS["search_result_limit"])
+            previous = st.session_state.get(widget_key, [])
             selected_values = st.sidebar.multiselect(
                 f"Select {column}",
-                options=unique_values,
-                default=unique_values
+                options=previous + [value for value in matches if value not in previous],
+                key=widget_key
             )
-            if selected_values:
-                filters[column] = selected_values
+            st.sidebar.caption(f"{len(column_index)} distinct values, showing {len(matches)} matches")
+        if selected_values:
+            filters[column] = selected_values
     
     # Apply filters
-    filtered_df = apply_filters(df, filters)
+    filtered_df = apply_filters(df, filters, dataset_key, index)
     
     # Display basic information
     st.header("Dataset Overview")
@@ -83,38 +90,54 @@ if uploaded_file is not None:
         "Select Visualization Type",
         ["Line Chart", "Bar Chart", "Pie Chart", "Heatmap"]
     )
+    filter_state = filter_state_key(filters)
     
     if viz_type == "Line Chart":
         x_col = st.selectbox("Select X-axis", filtered_df.columns)
         y_col = st.selectbox("Select Y-axis", filtered_df.select_dtypes(include=['number']).columns)
-        fig = create_line_chart(filtered_df, x_col, y_col, f"{y_col} vs {x_col}")
+        fig = cached_figure(lambda: create_line_chart(filtered_df, x_col, y_col, f"{y_col} vs {x_col}"),
+                            dataset_key, filter_state, viz_type, x_col, y_col)
         st.plotly_chart(fig)
     
     elif viz_type == "Bar Chart":
         x_col = st.selectbox("Select X-axis", filtered_df.columns)
         y_col = st.selectbox("Select Y-axis", filtered_df.select_dtypes(include=['number']).columns)
-        fig = create_bar_chart(filtered_df, x_col, y_col, f"{y_col} by {x_col}")
+        agg = st.selectbox("Aggregation", REDUCERS)
+        fig = cached_figure(lambda: create_bar_chart(filtered_df, x_col, y_col, f"{agg} of {y_col} by {x_col}", agg=agg),
+                            dataset_key, filter_state, viz_type, x_col, y_col, agg)
         st.plotly_chart(fig)
     
     elif viz_type == "Pie Chart":
         values_col = st.selectbox("Select Values", filtered_df.select_dtypes(include=['number']).columns)
         names_col = st.selectbox("Select Categories", filtered_df.columns)
-        fig = create_pie_chart(filtered_df, values_col, names_col, f"{values_col} by {names_col}")
+        agg = st.selectbox("Aggregation", REDUCERS)
+        fig = cached_figure(lambda: create_pie_chart(filtered_df, values_col, names_col, f"{agg} of {values_col} by {names_col}", agg=agg),
+                            dataset_key, filter_state, viz_type, values_col, names_col, agg)
         st.plotly_chart(fig)
     
     elif viz_type == "Heatmap":
-        fig = create_heatmap(filtered_df, "Correlation Heatmap")
+        method = st.selectbox("Correlation Method", METHODS)
+        # Correlate the filtered rows of the full frame through their mask instead of a copy
+        mask = build_mask_cached(df, filters, dataset_key, index)
+        fig = cached_figure(lambda: create_heatmap(df, "Correlation Heatmap", method, mask, dataset_key),
+                            dataset_key, filter_state, viz_type, method)
         st.plotly_chart(fig)
     
-    # Download options
+    # Download options (the file is only generated when the button is clicked)
     st.header("Download Data")
-    file_type = st.radio("Select file type", ["csv", "excel"])
-    download_link = get_download_link(filtered_df, "filtered_data", file_type)
-    st.markdown(download_link, unsafe_allow_html=True)
+    file_type = st.radio("Select file type", list(FORMATS))
+    extension, mime = FORMATS[file_type]
+    st.download_button(
+        f"Download {file_type.upper()} file",
+        data=lambda: read_export(filtered_df, file_type, dataset_key, filter_state),
+        file_name=f"filtered_data.{extension}",
+        mime=mime,
+        on_click="ignore"
+    )
     
-    # Display raw data
+    # Display raw data one page at a time
     st.header("Raw Data")
-    st.dataframe(filtered_df)
+    show_data_viewer(df, dataset_key, build_mask_cached(df, filters, dataset_key, index), "raw")
 
 # Custom CSS
 def load_css():
@@ -362,14 +385,8 @@ def load_css():
     """, unsafe_allow_html=True)
 
 def load_logo():
-    # Load Kuber Industry logo
-    logo_url = "https://lookaside.fbsbx.com/lookaside/crawler/media/?media_id=100066162236707"
-    try:
-        response = requests.get(logo_url)
-        logo = Image.open(BytesIO(response.content))
-        return logo
-    except:
-        return None
+    # Kuber Industry logo from the local copy; never waits on the network
+    return get_logo().data()
 
 # Authentication
 def init_auth():
@@ -448,7 +465,7 @@ def main_dashboard():
         
         st.markdown("---")
         
-        page = st.radio("Navigation", ["Home", "Static Data", "Dynamic Comparison", "Settings"])
+        page = st.radio("Navigation", ["Home", "Static Data", "Dynamic Comparison", "SQL Query", "Settings"])
         
         st.markdown("---")
         st.markdown("""
@@ -457,16 +474,125 @@ def main_dashboard():
             </div>
         """.format(st.session_state.user_role), unsafe_allow_html=True)
     
-    if page == "Home":
-        show_home()
-    elif page == "Static Data":
-        show_static_data()
-    elif page == "Dynamic Comparison":
-        show_dynamic_comparison()
-    elif page == "Settings":
-        show_settings()
+    with page_timer(page):
+        if page == "Home":
+            show_home()
+        elif page == "Static Data":
+            show_static_data()
+        elif page == "Dynamic Comparison":
+            show_dynamic_comparison()
+        elif page == "SQL Query":
+            show_sql_query()
+        elif page == "Settings":
+            show_settings()
+
+def chart_spec_inputs(df, chart_type, idx):
+    """Render the column/option widgets of a chart and return its spec."""
+    from aggregation import REDUCERS
+    from correlation import METHODS
+
+    if chart_type == "Line Chart":
+        col1, col2 = st.columns(2)
+        with col1:
+            x_col = st.selectbox("Select X-axis", df.columns, key=f"line_x_{idx}")
+        with col2:
+            y_col = st.selectbox("Select Y-axis", df.columns, key=f"line_y_{idx}")
+        exact = st.checkbox("Exact rendering (no downsampling)", key=f"line_exact_{idx}")
+        return {'type': chart_type, 'x': x_col, 'y': y_col, 'exact': exact}
+
+    if chart_type == "Bar Chart":
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            x_col = st.selectbox("Select X-axis", df.columns, key=f"bar_x_{idx}")
+        with col2:
+            y_col = st.selectbox("Select Y-axis", df.columns, key=f"bar_y_{idx}")
+        with col3:
+            agg = st.selectbox("Aggregation", REDUCERS, key=f"bar_agg_{idx}")
+        return {'type': chart_type, 'x': x_col, 'y': y_col, 'agg': agg}
+
+    if chart_type == "Pie Chart":
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            value_col = st.selectbox("Select Values", df.columns, key=f"pie_value_{idx}")
+        with col2:
+            name_col = st.selectbox("Select Categories", df.columns, key=f"pie_name_{idx}")
+        with col3:
+            agg = st.selectbox("Aggregation", REDUCERS, key=f"pie_agg_{idx}")
+        return {'type': chart_type, 'values': value_col, 'names': name_col, 'agg': agg}
+
+    if chart_type == "Scatter Plot":
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            x_col = st.selectbox("Select X-axis", df.columns, key=f"scatter_x_{idx}")
+        with col2:
+            y_col = st.selectbox("Select Y-axis", df.columns, key=f"scatter_y_{idx}")
+        with col3:
+            color_col = st.selectbox("Select Color", df.columns, key=f"scatter_color_{idx}")
+        exact = st.checkbox("Exact rendering (no downsampling)", key=f"scatter_exact_{idx}")
+        return {'type': chart_type, 'x': x_col, 'y': y_col, 'color': color_col, 'exact': exact}
+
+    if chart_type == "Box Plot":
+        col1, col2 = st.columns(2)
+        with col1:
+            y_col = st.selectbox("Select Y-axis", df.columns, key=f"box_y_{idx}")
+        with col2:
+            x_col = st.selectbox("Select X-axis (optional)", ["None"] + list(df.columns), key=f"box_x_{idx}")
+        return {'type': chart_type, 'x': None if x_col == "None" else x_col, 'y': y_col}
+
+    if chart_type == "Heatmap":
+        method = st.selectbox("Correlation Method", METHODS, key=f"heatmap_method_{idx}")
+        return {'type': chart_type, 'method': method}
+
+    return {'type': chart_type}
+
+def fill_chart_placeholders(pending):
+    """Place every scheduled chart into its placeholder as soon as it is ready."""
+    from render import get_render_scheduler
+
+    for future in get_render_scheduler().completed(pending):
+        placeholder, chart_key = pending[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            placeholder.error(f"Error rendering chart: {str(e)}")
+            continue
+        with placeholder.container(), stage("send_figure"):
+            st.plotly_chart(result.figure, use_container_width=True, key=chart_key)
+            st.caption(result.timing_label())
+
+def show_data_viewer(df, dataset_key, mask=None, key_prefix="viewer"):
+    """Show the rows selected by ``mask`` as a sortable table, sending only the current page."""
+    from config import VIEWER_SETTINGS
+    from viewer import page
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        columns = st.multiselect("Columns", list(df.columns), default=list(df.columns),
+                                 key=f"{key_prefix}_columns")
+    with col2:
+        sort_column = st.selectbox("Sort by", ["None"] + list(df.columns), key=f"{key_prefix}_sort")
+    with col3:
+        ascending = st.radio("Order", ["Ascending", "Descending"], key=f"{key_prefix}_order") == "Ascending"
+    with col4:
+        page_size = st.selectbox("Rows per page", VIEWER_SETTINGS["page_sizes"], key=f"{key_prefix}_page_size")
+
+    total = len(df) if mask is None else int(mask.sum())
+    page_count = max(1, -(-total // page_size))
+    page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1,
+                                  key=f"{key_prefix}_page") - 1
+    rows, total = page(df, dataset_key, mask, page_number, page_size,
+                       None if sort_column == "None" else sort_column, ascending, columns or None)
+    st.dataframe(rows, use_container_width=True)
+    start = page_number * page_size
+    st.caption(f"Rows {min(start + 1, total):,}-{start + len(rows):,} of {total:,} (page {page_number + 1} of {page_count})")
 
 def show_home():
+    from charts import CHART_TYPES, build_chart
+    from cube import get_cube
+    from pool import PoolLease, get_dataset_pool
+    from render import get_render_scheduler
+    from store import static_store
+
     st.markdown("""
         <div class='card' style='margin-bottom: 2rem;'>
             <h2 style='margin-bottom: 0.5rem;'>Welcome to <span style="color: var(--accent-color);">Kuber Industry Analytics</span></h2>
@@ -475,7 +601,12 @@ def show_home():
     """, unsafe_allow_html=True)
 
     try:
-        df = pd.read_csv(r"C:\Users\HIMANSHU\OneDrive\Desktop\New folder (5)\Test.csv")
+        # Every session shares the pool's single read-only copy of the default dataset
+        if "dataset_lease" not in st.session_state:
+            st.session_state.dataset_lease = PoolLease(get_dataset_pool())
+        df, dataset_key = st.session_state.dataset_lease.acquire(DEFAULT_DATASET)
+        memory_bytes = df.memory_usage(deep=True).sum()
+        raw_bytes = static_store.manifest(dataset_key).get('raw_bytes', memory_bytes)
 
         st.markdown("""
             <div class='card' style='margin-bottom: 2rem;'>
@@ -496,12 +627,18 @@ def show_home():
                     <div style='flex:1;'>
                         <div class='stMetric'>
                             <span style='font-size: 1.2rem; color: var(--text-secondary);'>Memory Usage</span><br>
-                            <span style='font-size: 2rem; font-weight: bold; color: var(--accent-color);'>{}</span>
+                            <span style='font-size: 2rem; font-weight: bold; color: var(--accent-color);'>{}</span><br>
+                            <span style='font-size: 0.9rem; color: var(--text-secondary);'>{}</span>
                         </div>
                     </div>
                 </div>
             </div>
-        """.format(len(df), len(df.columns), f"{df.memory_usage().sum() / 1024:.2f} KB"), unsafe_allow_html=True)
+        """.format(
+            len(df),
+            len(df.columns),
+            f"{memory_bytes / 1024:.2f} KB",
+            f"{raw_bytes / 1024:.2f} KB with default dtypes ({raw_bytes / memory_bytes:.1f}x smaller)"
+        ), unsafe_allow_html=True)
 
         st.markdown("""
             <div class='card' style='margin-bottom: 2rem;'>
@@ -510,88 +647,80 @@ def show_home():
             </div>
         """, unsafe_allow_html=True)
 
-        chart_types = ["Line Chart", "Bar Chart", "Pie Chart", "Heatmap", "Scatter Plot", "Box Plot"]
         selected_charts = st.multiselect(
             "Select Chart Types",
-            chart_types,
+            CHART_TYPES,
             default=["Line Chart", "Bar Chart"],
             help="Choose multiple chart types to display below."
         )
 
+        # Widgets and placeholders first; the charts are prepared on the render pool
+        scheduler = get_render_scheduler()
+        cube = get_cube(df, dataset_key)
+        pending = {}
         for idx, chart_type in enumerate(selected_charts):
             st.markdown(f"""
                 <div class='card' style='margin-bottom: 2rem; border-left: 6px solid var(--accent-color);'>
                     <h4 style='margin-bottom: 1rem;'>{chart_type}</h4>
             """, unsafe_allow_html=True)
 
-            if chart_type == "Line Chart":
-                col1, col2 = st.columns(2)
-                with col1:
-                    x_col = st.selectbox("Select X-axis", df.columns, key=f"line_x_{idx}")
-                with col2:
-                    y_col = st.selectbox("Select Y-axis", df.columns, key=f"line_y_{idx}")
-                fig = px.line(df, x=x_col, y=y_col, title=f"{y_col} over {x_col}")
-                fig.update_layout(template="plotly_dark", plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font=dict(color="white"))
-                st.plotly_chart(fig, use_container_width=True)
-
-            elif chart_type == "Bar Chart":
-                col1, col2 = st.columns(2)
-                with col1:
-                    x_col = st.selectbox("Select X-axis", df.columns, key=f"bar_x_{idx}")
-                with col2:
-                    y_col = st.selectbox("Select Y-axis", df.columns, key=f"bar_y_{idx}")
-                fig = px.bar(df, x=x_col, y=y_col, title=f"{y_col} by {x_col}")
-                fig.update_layout(template="plotly_dark", plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font=dict(color="white"))
-                st.plotly_chart(fig, use_container_width=True)
-
-            elif chart_type == "Pie Chart":
-                col1, col2 = st.columns(2)
-                with col1:
-                    value_col = st.selectbox("Select Values", df.columns, key=f"pie_value_{idx}")
-                with col2:
-                    name_col = st.selectbox("Select Categories", df.columns, key=f"pie_name_{idx}")
-                fig = px.pie(df, values=value_col, names=name_col, title=f"Distribution of {value_col}")
-                fig.update_layout(template="plotly_dark", plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font=dict(color="white"))
-                st.plotly_chart(fig, use_container_width=True)
-
-            elif chart_type == "Heatmap":
-                numeric_cols = df.select_dtypes(include=[np.number]).columns
-                corr = df[numeric_cols].corr()
-                fig = px.imshow(corr, title="Correlation Heatmap")
-                fig.update_layout(template="plotly_dark", plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font=dict(color="white"))
-                st.plotly_chart(fig, use_container_width=True)
-
-            elif chart_type == "Scatter Plot":
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    x_col = st.selectbox("Select X-axis", df.columns, key=f"scatter_x_{idx}")
-                with col2:
-                    y_col = st.selectbox("Select Y-axis", df.columns, key=f"scatter_y_{idx}")
-                with col3:
-                    color_col = st.selectbox("Select Color", df.columns, key=f"scatter_color_{idx}")
-                fig = px.scatter(df, x=x_col, y=y_col, color=color_col, title=f"{y_col} vs {x_col}")
-                fig.update_layout(template="plotly_dark", plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font=dict(color="white"))
-                st.plotly_chart(fig, use_container_width=True)
-
-            elif chart_type == "Box Plot":
-                col1, col2 = st.columns(2)
-                with col1:
-                    y_col = st.selectbox("Select Y-axis", df.columns, key=f"box_y_{idx}")
-                with col2:
-                    x_col = st.selectbox("Select X-axis (optional)", ["None"] + list(df.columns), key=f"box_x_{idx}")
-                if x_col == "None":
-                    fig = px.box(df, y=y_col, title=f"Box Plot of {y_col}")
-                else:
-                    fig = px.box(df, x=x_col, y=y_col, title=f"Box Plot of {y_col} by {x_col}")
-                fig.update_layout(template="plotly_dark", plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font=dict(color="white"))
-                st.plotly_chart(fig, use_container_width=True)
+            spec = chart_spec_inputs(df, chart_type, idx)
+            placeholder = st.empty()
+            placeholder.info(f"Rendering {chart_type}...")
+            future = scheduler.submit(lambda spec=spec: build_chart(df, spec, dataset_key, cube), dataset_key, spec)
+            pending[future] = (placeholder, f"home_chart_{idx}")
 
             st.markdown("</div>", unsafe_allow_html=True)
 
+        fill_chart_placeholders(pending)
+
     except Exception as e:
         st.error(f"Error loading default data: {str(e)}")
 
+def check_upload_size(uploaded_file) -> bool:
+    if uploaded_file.size > UPLOAD_SETTINGS["max_file_size"]:
+        st.error(f"{uploaded_file.name} exceeds the {UPLOAD_SETTINGS['max_file_size'] // (1024 * 1024)} MB upload limit.")
+        return False
+    return True
+
+def show_streaming_overview(uploaded_file):
+    from charts import DARK_LAYOUT
+    from ingest import stream_uploaded_csv
+    
+    progress = st.progress(0.0, text=f"Reading {uploaded_file.name}...")
+    summary = stream_uploaded_csv(
+        uploaded_file,
+        getattr(uploaded_file, 'file_id', uploaded_file.name),
+        on_progress=lambda fraction: progress.progress(fraction, text=f"Reading {uploaded_file.name}... {fraction:.0%}")
+    )
+    progress.empty()
+    
+    st.markdown("""
+        <div class='card'>
+            <h3>Data Overview</h3>
+        </div>
+    """, unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Dataset Shape", str(summary['shape']))
+        st.write("Missing Values:")
+        st.write(summary['null_counts'])
+    with col2:
+        st.write("Numeric Columns:")
+        st.dataframe(summary['numeric'], use_container_width=True)
+    if summary['correlation'] is not None and len(summary['correlation']):
+        fig = px.imshow(summary['correlation'], title="Correlation Heatmap (pearson)")
+        fig.update_layout(**DARK_LAYOUT)
+        st.plotly_chart(fig, use_container_width=True)
+    for column, counts in summary['category_counts'].items():
+        with st.expander(f"Category counts: {column}"):
+            st.dataframe(counts.head(50), use_container_width=True)
+
 def show_static_data():
+    from cache import load_uploaded_file, uploaded_columns, uploaded_sheet_names
+    from charts import build_chart
+    from figure_cache import cached_figure
+    
     st.markdown("""
         <div class='card'>
             <h2>Static Data Analysis</h2>
@@ -602,8 +731,27 @@ def show_static_data():
     # File uploader for static data
     uploaded_file = st.file_uploader("Upload your static data file", type=['csv', 'xlsx'])
     
-    if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file) if uploaded_file.name.endswith('.csv') else pd.read_excel(uploaded_file)
+    if uploaded_file is not None and check_upload_size(uploaded_file):
+        # Large CSVs are summarised in chunks; the full frame is only loaded on request
+        if uploaded_file.name.endswith('.csv') and uploaded_file.size > UPLOAD_SETTINGS["stream_threshold"]:
+            show_streaming_overview(uploaded_file)
+            if not st.checkbox("Load full dataset for raw view and charts"):
+                return
+        
+        # Workbooks are converted to a snapshot once; sheet and column picks read from it
+        sheet_name, columns = 0, None
+        if not uploaded_file.name.endswith('.csv'):
+            sheets = uploaded_sheet_names(uploaded_file)
+            col1, col2 = st.columns(2)
+            with col1:
+                sheet_name = st.selectbox("Sheet", list(range(len(sheets))), format_func=lambda i: sheets[i])
+            available = uploaded_columns(uploaded_file, sheet_name)
+            with col2:
+                selected = st.multiselect("Columns", available, default=available)
+            if selected and len(selected) < len(available):
+                columns = selected
+        
+        df, dataset_key = load_uploaded_file(uploaded_file, clean=False, sheet_name=sheet_name, columns=columns)
         
         # Data preview
         st.markdown("""
@@ -623,67 +771,17 @@ def show_static_data():
         viz_type = st.selectbox("Select Visualization Type", 
                               ["Line Chart", "Bar Chart", "Pie Chart", "Heatmap"])
         
-        if viz_type == "Line Chart":
-            col1, col2 = st.columns(2)
-            with col1:
-                x_col = st.selectbox("Select X-axis", df.columns)
-            with col2:
-                y_col = st.selectbox("Select Y-axis", df.columns)
-            
-            fig = px.line(df, x=x_col, y=y_col, title=f"{y_col} over {x_col}")
-            fig.update_layout(
-                template="plotly_dark",
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                font=dict(color="white")
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-        elif viz_type == "Bar Chart":
-            col1, col2 = st.columns(2)
-            with col1:
-                x_col = st.selectbox("Select X-axis", df.columns)
-            with col2:
-                y_col = st.selectbox("Select Y-axis", df.columns)
-            
-            fig = px.bar(df, x=x_col, y=y_col, title=f"{y_col} by {x_col}")
-            fig.update_layout(
-                template="plotly_dark",
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                font=dict(color="white")
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-        elif viz_type == "Pie Chart":
-            col1, col2 = st.columns(2)
-            with col1:
-                value_col = st.selectbox("Select Values", df.columns)
-            with col2:
-                name_col = st.selectbox("Select Categories", df.columns)
-            
-            fig = px.pie(df, values=value_col, names=name_col, title=f"Distribution of {value_col}")
-            fig.update_layout(
-                template="plotly_dark",
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                font=dict(color="white")
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-        elif viz_type == "Heatmap":
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            corr = df[numeric_cols].corr()
-            fig = px.imshow(corr, title="Correlation Heatmap")
-            fig.update_layout(
-                template="plotly_dark",
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                font=dict(color="white")
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        spec = chart_spec_inputs(df, viz_type, "static")
+        fig = cached_figure(lambda: build_chart(df, spec, dataset_key), dataset_key, spec)
+        st.plotly_chart(fig, use_container_width=True)
+
 
 def show_dynamic_comparison():
+    from cache import load_uploaded_files
+    from charts import CHART_TYPES, DARK_LAYOUT, build_chart
+    from diff import get_diff
+    from render import get_render_scheduler
+    
     st.markdown("""
         <div class='card'>
             <h2>Dynamic Data Comparison</h2>
@@ -710,9 +808,11 @@ def show_dynamic_comparison():
         """, unsafe_allow_html=True)
         file2 = st.file_uploader("Upload second dataset", type=['csv', 'xlsx'])
     
-    if file1 is not None and file2 is not None:
-        df1 = pd.read_csv(file1) if file1.name.endswith('.csv') else pd.read_excel(file1)
-        df2 = pd.read_csv(file2) if file2.name.endswith('.csv') else pd.read_excel(file2)
+    if file1 is not None and file2 is not None and check_upload_size(file1) and check_upload_size(file2):
+        # Both uploads are parsed in parallel on the ingestion pool
+        (df1, key1), (df2, key2) = load_uploaded_files([file1, file2], clean=False)
+        # Keep the snapshots queryable as df1/df2 from the SQL Query page
+        st.session_state.query_tables = {"df1": key1, "df2": key2}
         
         # Compare datasets
         st.markdown("""
@@ -728,12 +828,49 @@ def show_dynamic_comparison():
         with col2:
             st.metric("Dataset 2 Shape", str(df2.shape))
         
+        # Row-level differences, matching rows on the chosen key columns
+        common_columns = [column for column in df1.columns if column in df2.columns]
+        default_keys = [column for column in COMPARISON_SETTINGS["default_key_columns"] if column in common_columns]
+        key_columns = st.multiselect("Key Columns (rows are matched on these, by position when empty)",
+                                     common_columns, default=default_keys)
+        diff = get_diff(df1, key1, df2, key2, key_columns)
+        summary = diff.summary()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Added Rows", summary['added_rows'])
+        with col2:
+            st.metric("Removed Rows", summary['removed_rows'])
+        with col3:
+            st.metric("Changed Rows", summary['changed_rows'])
+        with col4:
+            st.metric("Unchanged Rows", summary['unchanged_rows'])
+        
+        if summary['duplicate_keys1'] or summary['duplicate_keys2']:
+            st.warning(f"Duplicate keys ignored: {summary['duplicate_keys1']} in dataset 1, "
+                       f"{summary['duplicate_keys2']} in dataset 2. Only the first row of each key is compared.")
+        
+        column_changes = diff.column_changes()
+        if summary['changed_values']:
+            fig = px.bar(x=column_changes.index, y=column_changes.values,
+                         labels={'x': 'Column', 'y': 'Changed Values'}, title="Changes per Column")
+            fig.update_layout(**DARK_LAYOUT)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with st.expander("Changed values"):
+            st.dataframe(diff.changed_values(df1, df2))
+        with st.expander("Added rows"):
+            st.dataframe(diff.added_rows(df2))
+        with st.expander("Removed rows"):
+            st.dataframe(diff.removed_rows(df1))
+        
         # Multiple Chart Options for Comparison
-        chart_types = ["Line Chart", "Bar Chart", "Pie Chart", "Heatmap", "Scatter Plot", "Box Plot"]
-        selected_charts = st.multiselect("Select Chart Types for Comparison", chart_types, default=["Line Chart", "Bar Chart"])
+        selected_charts = st.multiselect("Select Chart Types for Comparison", CHART_TYPES, default=["Line Chart", "Bar Chart"])
 
-        # Generate selected charts for both datasets
-        for chart_type in selected_charts:
+        # Generate selected charts for both datasets on the render pool
+        scheduler = get_render_scheduler()
+        pending = {}
+        for idx, chart_type in enumerate(selected_charts):
             st.markdown(f"""
                 <div class='card'>
                     <h4>{chart_type} Comparison</h4>
@@ -741,29 +878,93 @@ def show_dynamic_comparison():
             """, unsafe_allow_html=True)
 
             col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("### Dataset 1")
-                if chart_type == "Line Chart":
-                    x_col = st.selectbox("Select X-axis", df1.columns, key=f"line_x1")
-                    y_col = st.selectbox("Select Y-axis", df1.columns, key=f"line_y1")
-                    fig = px.line(df1, x=x_col, y=y_col, title=f"Dataset 1: {y_col} over {x_col}")
-                    fig.update_layout(template="plotly_dark", plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font=dict(color="white"))
-                    st.plotly_chart(fig, use_container_width=True)
+            datasets = ((col1, "Dataset 1", df1, key1, 1), (col2, "Dataset 2", df2, key2, 2))
+            for column, label, frame, frame_key, number in datasets:
+                with column:
+                    st.markdown(f"### {label}")
+                    spec = chart_spec_inputs(frame, chart_type, f"{idx}_{number}")
+                    spec['title_prefix'] = f"{label}: "
+                    placeholder = st.empty()
+                    placeholder.info(f"Rendering {chart_type}...")
+                    future = scheduler.submit(
+                        lambda frame=frame, spec=spec, frame_key=frame_key: build_chart(frame, spec, frame_key),
+                        frame_key, spec
+                    )
+                    pending[future] = (placeholder, f"comparison_chart_{idx}_{number}")
 
-            with col2:
-                st.markdown("### Dataset 2")
-                if chart_type == "Line Chart":
-                    x_col = st.selectbox("Select X-axis", df2.columns, key=f"line_x2")
-                    y_col = st.selectbox("Select Y-axis", df2.columns, key=f"line_y2")
-                    fig = px.line(df2, x=x_col, y=y_col, title=f"Dataset 2: {y_col} over {x_col}")
-                    fig.update_layout(template="plotly_dark", plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font=dict(color="white"))
-                    st.plotly_chart(fig, use_container_width=True)
+        fill_chart_placeholders(pending)
 
-            # Add similar chart generation for other chart types...
-            # (Bar Chart, Pie Chart, Heatmap, Scatter Plot, Box Plot)
+def show_sql_query():
+    from charts import CHART_TYPES, build_chart
+    from config import QUERY_SETTINGS
+    from figure_cache import cached_figure
+    from pool import get_dataset_pool
+    from query import query_key, run_query
+    from store import static_store, upload_store
+
+    st.markdown("""
+        <div class='card'>
+            <h2>SQL Query</h2>
+            <p style='color: var(--text-secondary);'>Filter, group and join the loaded datasets with SQL</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Tables are the memory-mapped snapshots of the Home and Dynamic Comparison datasets
+    home_table, home_key = get_dataset_pool().table(DEFAULT_DATASET)
+    table_keys = {"home": home_key}
+    # Uploads whose snapshot was pruned from the upload store are no longer queryable
+    table_keys.update({name: key for name, key in st.session_state.get("query_tables", {}).items()
+                       if upload_store.has(key)})
+    stores = {name: static_store if name == "home" else upload_store for name in table_keys}
+    for name, key in table_keys.items():
+        manifest = stores[name].manifest(key)
+        columns = ", ".join(column['name'] for column in manifest['columns'])
+        st.caption(f"**{name}** ({manifest['rows']:,} rows): {columns}")
+    if "df1" not in table_keys:
+        st.caption("Upload two datasets on the Dynamic Comparison page to query them as df1 and df2.")
+
+    sql = st.text_area("Query", value=QUERY_SETTINGS["default_sql"], height=150)
+    if st.button("Run Query"):
+        key = query_key(sql, table_keys)
+        try:
+            tables = {name: home_table if name == "home" else stores[name].read_table(table_key)
+                      for name, table_key in table_keys.items()}
+            st.session_state.query_result = run_query(sql, tables, key)
+        except Exception as e:
+            st.session_state.pop("query_result", None)
+            st.error(f"Query failed: {str(e)}")
+
+    result = st.session_state.get("query_result")
+    if result is None:
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Rows Returned", f"{len(result.frame):,}")
+    with col2:
+        st.metric("Query Time", f"{result.seconds * 1000:.0f} ms")
+    with col3:
+        st.metric("Rows Scanned", f"{result.rows_scanned:,}")
+    st.caption(result.summary_label())
+
+    show_data_viewer(result.frame, result.key, None, "query")
+
+    if len(result.frame) and len(result.frame.columns):
+        chart_type = st.selectbox("Chart the Result", CHART_TYPES, key="query_chart_type")
+        spec = chart_spec_inputs(result.frame, chart_type, "query")
+        try:
+            fig = cached_figure(lambda: build_chart(result.frame, spec, result.key), result.key, spec)
+            st.plotly_chart(fig, use_container_width=True)
+        except Exception as e:
+            st.error(f"Error rendering chart: {str(e)}")
 
 def show_settings():
+    from cache import get_dataset_cache
+    from figure_cache import get_figure_cache
+    from instrumentation import get_stage_recorder, latency_summary, set_enabled
+    from lazy import import_times
+    from pool import get_dataset_pool
+    
     st.markdown("""
         <div class='card'>
             <h2>Settings</h2>
@@ -788,6 +989,51 @@ def show_settings():
     download_format = st.multiselect("Select download formats", 
                                    ["PDF", "CSV", "PNG"])
     
+    # Dataset cache statistics
+    st.markdown("""
+        <div class='card'>
+            <h3>Caches</h3>
+        </div>
+    """, unsafe_allow_html=True)
+    for label, cache_stats in (("Dataset", get_dataset_cache().stats()), ("Figure", get_figure_cache().stats())):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(f"{label} Cache Hits", cache_stats['hits'])
+        with col2:
+            st.metric(f"{label} Cache Misses", cache_stats['misses'])
+        with col3:
+            st.metric(f"{label} Cache Memory", f"{cache_stats['current_bytes'] / (1024 * 1024):.1f} MB")
+    pool_stats = get_dataset_pool().stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Shared Datasets", pool_stats['datasets'] + pool_stats['stale_versions'])
+    with col2:
+        st.metric("Sessions Sharing Them", pool_stats['sessions'])
+    with col3:
+        st.metric("Shared Dataset Memory", f"{pool_stats['current_bytes'] / (1024 * 1024):.1f} MB")
+    
+    # Stage latencies (admins only)
+    if st.session_state.user_role == "admin":
+        st.markdown("""
+            <div class='card'>
+                <h3>Performance</h3>
+            </div>
+        """, unsafe_allow_html=True)
+        set_enabled(st.toggle("Record stage timings", value=get_stage_recorder().enabled))
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("Latency per stage")
+            st.dataframe(latency_summary("stage"), use_container_width=True)
+        with col2:
+            st.caption("Latency per page")
+            st.dataframe(latency_summary("page"), use_container_width=True)
+        times = import_times()
+        if times:
+            st.caption("Deferred imports: " + ", ".join(f"{name} {seconds * 1000:.0f} ms"
+                                                       for name, seconds in sorted(times.items())))
+        if st.button("Reset Timings"):
+            get_stage_recorder().clear()
+    
     # Save settings
     if st.button("Save Settings", use_container_width=True):
         st.success("Settings saved successfully!")
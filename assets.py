@@ -0,0 +1,107 @@
+import io
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import ASSET_SETTINGS
+
+
+class RemoteAsset:
+    """An image fetched from a URL, cached on disk and decoded once per process.
+
+    ``data()`` only ever reads the local copy and never waits on the
+    network: when the copy is missing or older than ``refresh_interval`` a
+    single background thread re-downloads it with a strict timeout, and
+    the new version is picked up on a later render. Failed downloads are
+    retried after ``retry_interval`` at the earliest.
+    """
+
+    def __init__(self, url: str, path: Path, timeout: float, refresh_interval: float, retry_interval: float):
+        self.url = url
+        self.path = Path(path)
+        self.timeout = timeout
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self._data: Optional[bytes] = None
+        self._data_mtime: Optional[float] = None
+        self._last_attempt = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def data(self) -> Optional[bytes]:
+        """Return the asset as PNG bytes, or None until a copy has been downloaded."""
+        mtime = self._mtime()
+        if mtime is None or time.time() - mtime > self.refresh_interval:
+            self._schedule_refresh()
+        if mtime is None:
+            return None
+
+        with self._lock:
+            if self._data_mtime != mtime:
+                self._data = self._decode(self.path.read_bytes())
+                self._data_mtime = mtime
+            return self._data
+
+    @staticmethod
+    def _decode(raw: bytes) -> Optional[bytes]:
+        """Decode an image once and re-encode it as PNG, so renders can pass bytes straight through."""
+        from PIL import Image
+
+        try:
+            image = Image.open(io.BytesIO(raw))
+            image.load()
+        except Exception:
+            return None
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def _schedule_refresh(self) -> None:
+        with self._lock:
+            if self._refreshing or time.time() - self._last_attempt < self.retry_interval:
+                return
+            self._refreshing = True
+            self._last_attempt = time.time()
+        threading.Thread(target=self._refresh, name="asset-refresh", daemon=True).start()
+
+    def _refresh(self) -> None:
+        """Download the asset and atomically replace the local copy if it is a valid image."""
+        import requests
+
+        try:
+            response = requests.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            if self._decode(response.content) is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+            tmp_path.write_bytes(response.content)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            # Keep serving the existing copy; the next attempt waits for retry_interval
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+_logo = RemoteAsset(
+    ASSET_SETTINGS["logo_url"],
+    ASSET_SETTINGS["logo_path"],
+    ASSET_SETTINGS["timeout"],
+    ASSET_SETTINGS["refresh_interval"],
+    ASSET_SETTINGS["retry_interval"]
+)
+
+
+def get_logo() -> RemoteAsset:
+    """Return the process-wide logo asset."""
+    return _logo
@@ -0,0 +1,84 @@
+"""Compare Excel ingestion paths on generated workbooks.
+
+Workbooks with the Test.csv schema are generated once per size (1M rows
+take several minutes to write) and cached in the temp directory. Timed:
+pd.read_excel with openpyxl (the previous upload path), the streaming
+openpyxl reader, calamine (when python-calamine is installed) and
+re-opening the Arrow snapshot in full and for a two-column subset.
+
+Usage: python benchmarks/bench_excel.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import importlib.util
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DATASET_SETTINGS, DEFAULT_DATASET  # noqa: E402
+from dtypes import optimize_dtypes  # noqa: E402
+from excel import read_sheet  # noqa: E402
+from export import write_xlsx  # noqa: E402
+from store import DatasetStore  # noqa: E402
+
+SUBSET = ["Item_MRP", "Outlet_Type"]
+
+
+def make_workbook(rows, seed=0):
+    path = Path(tempfile.gettempdir()) / f"kuber_bench_{rows}.xlsx"
+    if not path.exists():
+        base = pd.read_csv(DEFAULT_DATASET)
+        rng = np.random.default_rng(seed)
+        write_xlsx(base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True), path, 50_000)
+    return path
+
+
+def with_engine(engine, func):
+    previous = DATASET_SETTINGS["excel_engine"]
+    DATASET_SETTINGS["excel_engine"] = engine
+    try:
+        return func()
+    finally:
+        DATASET_SETTINGS["excel_engine"] = previous
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    paths = [("pd.read_excel", lambda p: pd.read_excel(p, engine="openpyxl")),
+             ("streaming", lambda p: with_engine("openpyxl", lambda: read_sheet(p)))]
+    if importlib.util.find_spec("python_calamine") is not None:
+        paths.append(("calamine", lambda p: with_engine("calamine", lambda: read_sheet(p))))
+
+    store = DatasetStore(Path(tempfile.mkdtemp(prefix="kuber_bench_store_")))
+    print(f"{'rows':>10} {'path':>14} {'seconds':>9} {'speedup':>8} {'Krows/s':>9}")
+    for rows in args.rows:
+        path = make_workbook(rows)
+        baseline = None
+        for label, read in paths:
+            seconds, df = timed(lambda: read(path))
+            baseline = baseline or seconds
+            print(f"{rows:>10} {label:>14} {seconds:>9.3f} {baseline / seconds:>7.1f}x {rows / seconds / 1e3:>9.1f}")
+
+        key = f"bench-{rows}"
+        store.write(key, optimize_dtypes(df))
+        for label, columns in (("snapshot", None), ("snapshot cols", SUBSET)):
+            seconds, _ = timed(lambda: store.read(key, columns))
+            print(f"{rows:>10} {label:>14} {seconds:>9.3f} {baseline / seconds:>7.1f}x {rows / seconds / 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare the single-mask filter engine with the previous apply_filters loop.
+
+Usage: python benchmarks/bench_filters.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DEFAULT_DATASET  # noqa: E402
+from utils import apply_filters, optimize_dtypes  # noqa: E402
+
+FILTER_COLUMNS = [
+    "Item_Fat_Content", "Item_Type", "Outlet_Identifier",
+    "Outlet_Size", "Outlet_Location_Type", "Outlet_Type"
+]
+
+
+def legacy_apply_filters(df, filters):
+    """The copy-and-reindex implementation apply_filters used to have."""
+    filtered_df = df.copy()
+    for column, value in filters.items():
+        if value is not None and value != '':
+            if isinstance(value, (list, tuple)):
+                filtered_df = filtered_df[filtered_df[column].isin(value)]
+            else:
+                filtered_df = filtered_df[filtered_df[column] == value]
+    return filtered_df
+
+
+def make_frame(rows, seed=0):
+    base = pd.read_csv(DEFAULT_DATASET)
+    rng = np.random.default_rng(seed)
+    return base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+
+
+def make_filters(df, count, seed=0):
+    """Filters that keep all but one value of each column, like the sidebar."""
+    rng = np.random.default_rng(seed)
+    filters = {}
+    for column in FILTER_COLUMNS[:count]:
+        values = list(df[column].dropna().unique())
+        values.pop(rng.integers(0, len(values)))
+        filters[column] = values
+    return filters
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--filters", type=int, nargs="+", default=[1, 3, 6])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'filters':>8} {'dtypes':>8} {'legacy ms':>10} {'engine ms':>10} {'speedup':>8} {'Mrows/s':>8}")
+    for rows in args.rows:
+        raw = make_frame(rows)
+        for label, df in (("object", raw), ("compact", optimize_dtypes(raw))):
+            for count in args.filters:
+                filters = make_filters(df, count)
+                assert len(legacy_apply_filters(df, filters)) == len(apply_filters(df, filters))
+                legacy = best_of(lambda: legacy_apply_filters(df, filters), args.repeat)
+                engine = best_of(lambda: apply_filters(df, filters), args.repeat)
+                print(f"{rows:>10} {count:>8} {label:>8} {legacy * 1000:>10.2f} {engine * 1000:>10.2f} "
+                      f"{legacy / engine:>7.1f}x {rows / engine / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Profile the imports the dashboard pays for on a cold start.
+
+Each stage is imported in a fresh interpreter run with ``-X importtime``:
+"login" is what app.py imports at the top (all the login screen needs),
+"dashboard" adds the modules its pages import on first use. The slowest
+modules are listed by cumulative import time, and the exit status is 1
+when a stage's import time exceeds its budget. tests/test_startup.py
+enforces the same budgets under pytest.
+
+Usage: python benchmarks/bench_startup.py [--top 15] [--login-budget 1.0] [--dashboard-budget 3.0]
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Import-time budgets in seconds
+LOGIN_BUDGET = 1.0
+DASHBOARD_BUDGET = 3.0
+# Libraries the login screen must not import (Streamlit itself already imports plotly)
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "duckdb"]
+
+
+def app_imports():
+    """Return the modules app.py imports at the top and the ones it imports lazily."""
+    tree = ast.parse((ROOT / "app.py").read_text(encoding="utf-8"))
+    top_level, deferred = [], []
+    for node in ast.walk(tree):
+        modules = []
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules = [node.module]
+        elif (isinstance(node, ast.Call) and getattr(node.func, "id", None) == "lazy_module"
+              and node.args and isinstance(node.args[0], ast.Constant)):
+            deferred.append(node.args[0].value)
+        target = top_level if node in tree.body else deferred
+        target.extend(module for module in modules if module not in target)
+    return top_level, [module for module in deferred if module not in top_level]
+
+
+def profile(modules, repeat):
+    """Import ``modules`` in fresh interpreters; return the best wall time and per-module timings."""
+    code = ("import time; start = time.perf_counter(); "
+            + "; ".join(f"import {module}" for module in modules)
+            + "; print(time.perf_counter() - start)")
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    best, timings = None, {}
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True)
+        seconds = float(result.stdout.strip().splitlines()[-1])
+        if best is None or seconds < best:
+            best, timings = seconds, {}
+            for line in result.stderr.splitlines():
+                if not line.startswith("import time:") or "cumulative" in line:
+                    continue
+                _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+                timings[name] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+    return best, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--login-budget", type=float, default=LOGIN_BUDGET, help="seconds")
+    parser.add_argument("--dashboard-budget", type=float, default=DASHBOARD_BUDGET, help="seconds")
+    args = parser.parse_args()
+
+    top_level, deferred = app_imports()
+    stages = [("login", top_level, args.login_budget), ("dashboard", top_level + deferred, args.dashboard_budget)]
+    over_budget = False
+    for stage, modules, budget in stages:
+        seconds, timings = profile(modules, args.repeat)
+        status = "ok" if seconds <= budget else "OVER BUDGET"
+        over_budget |= seconds > budget
+        print(f"{stage}: {seconds:.3f}s for {len(modules)} imports (budget {budget:.2f}s) {status}")
+        print(f"  {'module':<40} {'self s':>8} {'cumulative s':>13}")
+        slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+        for name, (self_s, cumulative_s) in slowest:
+            print(f"  {name:<40} {self_s:>8.3f} {cumulative_s:>13.3f}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
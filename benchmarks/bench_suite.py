@@ -0,0 +1,214 @@
+"""Time the hot paths of utils.py on synthetic data and compare runs against a baseline.
+
+Datasets follow the Test.csv schema (see benchmarks/synthetic.py) with
+compact dtypes, as uploads have after loading. Each benchmark reports the
+best and median of --repeat timed runs, plus peak traced memory from one
+extra run under tracemalloc (allocations made by numpy and pandas count;
+Arrow buffers do not). Results are written as JSON; with --baseline every
+benchmark is compared to the same benchmark and row count of an earlier
+run, and the exit status is 1 when one is slower by more than --tolerance.
+A baseline generated with another seed, cardinality or null rate is not
+compared (exit status 2), since its timings come from different data.
+
+Usage: python benchmarks/bench_suite.py [--rows 10k 100k 1M] [--output run.json]
+       [--baseline previous.json] [--only clean_data apply_filters]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dtypes import optimize_dtypes  # noqa: E402
+from instrumentation import set_enabled  # noqa: E402
+from synthetic import build_schema, generate, parse_overrides, parse_rows  # noqa: E402
+from utils import (apply_filters, clean_data, compare_datasets, create_bar_chart,  # noqa: E402
+                   create_heatmap, create_line_chart, create_pie_chart, create_scatter_chart,
+                   get_download_link)
+
+# Excel sheets hold at most 1,048,576 rows
+EXCEL_MAX_ROWS = 1_048_575
+
+# Settings that change the generated data; a baseline must match them to be comparable
+DATA_SETTINGS = ("seed", "cardinality", "null_rate")
+
+
+def make_filters(df):
+    """Sidebar-like filters: all but one value of two columns and an MRP range."""
+    filters = {}
+    for column in ("Item_Type", "Outlet_Type"):
+        values = list(df[column].dropna().unique())
+        filters[column] = values[1:]
+    filters["Item_MRP"] = {"min": 50.0, "max": 200.0}
+    return filters
+
+
+def make_changed_copy(df, seed):
+    """A second version of ``df`` with 1% of MRPs changed and 1% of rows dropped."""
+    rng = np.random.default_rng(seed + 1)
+    changed = df.copy()
+    rows = rng.random(len(df)) < 0.01
+    changed.loc[rows, "Item_MRP"] = changed.loc[rows, "Item_MRP"] * 1.1
+    return changed[rng.random(len(df)) >= 0.01].reset_index(drop=True)
+
+
+def benchmarks(df, other, rows):
+    """Return (name, call) pairs of every benchmarked hot path for a dataset."""
+    filters = make_filters(df)
+    cases = [
+        ("clean_data", lambda: clean_data(df)),
+        ("apply_filters", lambda: apply_filters(df, filters)),
+        ("compare_datasets", lambda: compare_datasets(df, other, ["Item_Identifier", "Outlet_Identifier"])),
+        ("create_line_chart", lambda: create_line_chart(df, "Item_Visibility", "Item_MRP", "MRP")),
+        ("create_bar_chart", lambda: create_bar_chart(df, "Item_Type", "Item_MRP", "MRP by type")),
+        ("create_pie_chart", lambda: create_pie_chart(df, "Item_MRP", "Outlet_Type", "MRP by outlet")),
+        ("create_scatter_chart", lambda: create_scatter_chart(df, "Item_Visibility", "Item_MRP", "MRP",
+                                                              color_col="Outlet_Type")),
+        ("create_heatmap", lambda: create_heatmap(df, "Correlation")),
+        ("get_download_link[csv]", lambda: get_download_link(df, "data", "csv")),
+    ]
+    if rows <= EXCEL_MAX_ROWS:
+        cases.append(("get_download_link[excel]", lambda: get_download_link(df, "data", "excel")))
+    return cases
+
+
+def measure(call, repeat):
+    """Return the timings of ``repeat`` runs and the peak traced memory of one more."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return timings, peak
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def data_mismatches(settings, baseline):
+    """Return the data settings that differ between this run and the baseline."""
+    def normalized(run, name):
+        value = run.get(name)
+        return sorted(value or []) if isinstance(value, list) or value is None else value
+
+    previous = baseline.get("settings", {})
+    return [name for name in DATA_SETTINGS if normalized(settings, name) != normalized(previous, name)]
+
+
+def compare(results, baseline, tolerance):
+    """Print the change of every result against the baseline; return the regressed benchmarks."""
+    previous = {(entry["name"], entry["rows"]): entry for entry in baseline["results"]}
+    regressions = []
+    print(f"\n{'benchmark':<26} {'rows':>10} {'baseline ms':>12} {'now ms':>10} {'change':>8}")
+    for entry in results:
+        before = previous.get((entry["name"], entry["rows"]))
+        if before is None:
+            continue
+        change = entry["best_s"] / before["best_s"] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(entry)
+            flag = "  REGRESSION"
+        print(f"{entry['name']:<26} {entry['rows']:>10} {before['best_s'] * 1000:>12.1f} "
+              f"{entry['best_s'] * 1000:>10.1f} {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_rows, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cardinality", nargs="*", metavar="COLUMN=N")
+    parser.add_argument("--null-rate", nargs="*", metavar="COLUMN=RATE")
+    parser.add_argument("--only", nargs="*", help="run only these benchmarks")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="JSON results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    # Stage timings would otherwise be written to the application log for every call
+    set_enabled(False)
+    schema = build_schema(cardinality=parse_overrides(args.cardinality, int),
+                          null_rates=parse_overrides(args.null_rate, float))
+
+    results = []
+    print(f"{'benchmark':<26} {'rows':>10} {'best ms':>10} {'median ms':>10} {'peak MB':>9}")
+    for rows in args.rows:
+        df = optimize_dtypes(generate(rows, args.seed, schema))
+        other = make_changed_copy(df, args.seed)
+        for name, call in benchmarks(df, other, rows):
+            if args.only and name not in args.only and name.split("[")[0] not in args.only:
+                continue
+            timings, peak = measure(call, args.repeat)
+            entry = {
+                "name": name,
+                "rows": rows,
+                "best_s": min(timings),
+                "median_s": float(np.median(timings)),
+                "timings_s": timings,
+                "peak_bytes": peak
+            }
+            results.append(entry)
+            print(f"{name:<26} {rows:>10} {entry['best_s'] * 1000:>10.1f} {entry['median_s'] * 1000:>10.1f} "
+                  f"{peak / 2 ** 20:>9.1f}")
+
+    report = {
+        "environment": environment(),
+        "settings": {"repeat": args.repeat, "seed": args.seed, "cardinality": args.cardinality,
+                     "null_rate": args.null_rate},
+        "results": results
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        mismatches = data_mismatches(report["settings"], baseline)
+        if mismatches:
+            for name in mismatches:
+                print(f"\n{name} differs from the baseline: {report['settings'][name]!r} now, "
+                      f"{baseline.get('settings', {}).get(name)!r} in {args.baseline}")
+            print("Not comparing runs on different data")
+            sys.exit(2)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Synthetic datasets with the schema of Test.csv at any scale.
+
+Each column is profiled from a schema source (Test.csv by default): text
+columns keep their observed values and frequencies, including the
+inconsistent spellings clean_data has to unify; numeric columns are drawn
+from their observed distribution. Cardinality and null rate can be set
+per column. Frames are generated in chunks from a seed, so the same
+arguments always give the same data; the command line writes each chunk
+to the output file as it is generated, so memory stays at one chunk.
+
+Usage: python benchmarks/synthetic.py --rows 1M --output big.csv
+       [--cardinality Item_Identifier=100000] [--null-rate Item_Weight=0.3]
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DEFAULT_DATASET  # noqa: E402
+
+SUFFIXES = {"k": 1_000, "m": 1_000_000}
+CHUNK_ROWS = 1_000_000
+
+
+def parse_rows(text: str) -> int:
+    """Parse a row count such as 50000, 10k or 50M."""
+    text = text.strip().lower().replace("_", "")
+    if text and text[-1] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def parse_overrides(pairs, value_type):
+    """Parse COLUMN=VALUE command line pairs."""
+    overrides = {}
+    for pair in pairs or []:
+        column, _, value = pair.partition("=")
+        overrides[column] = value_type(value)
+    return overrides
+
+
+class ColumnSpec:
+    """How to draw one column: its kind, values (or distribution) and null rate."""
+
+    def __init__(self, name: str, series: pd.Series, cardinality: Optional[int] = None,
+                 null_rate: Optional[float] = None):
+        self.name = name
+        self.quantiles = None
+        self.null_rate = float(series.isna().mean()) if null_rate is None else null_rate
+        observed = series.dropna()
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            self.kind = "int" if pd.api.types.is_integer_dtype(observed.dtype) or (observed % 1 == 0).all() else "float"
+        else:
+            self.kind = "text"
+
+        if self.kind == "float" and cardinality is None and observed.nunique() > 0.1 * len(observed):
+            # Continuous values follow the observed quantiles; the others are drawn from the observed values
+            self.quantiles = np.sort(observed.to_numpy(dtype=np.float64))
+            return
+
+        counts = observed.value_counts()
+        values = list(counts.index)
+        weights = counts.to_numpy(dtype=np.float64)
+        if cardinality is not None:
+            if cardinality <= len(values):
+                values, weights = values[:cardinality], weights[:cardinality]
+            else:
+                # Extra values are variants of the observed ones, drawn as often as an average value
+                extra = cardinality - len(values)
+                values = values + [self._variant(values, i) for i in range(extra)]
+                weights = np.concatenate([weights, np.full(extra, weights.mean())])
+        self.values = values
+        self.weights = weights / weights.sum()
+
+    def _variant(self, values: list, i: int):
+        if self.kind == "text":
+            return f"{values[i % len(values)]}-{i}"
+        # New numbers above the observed ones, so they never collide
+        return max(values) + (i + 1) * (1 if self.kind == "int" else 0.001)
+
+    def draw(self, rng: np.random.Generator, rows: int) -> pd.Series:
+        nulls = rng.random(rows) < self.null_rate if self.null_rate else None
+        if self.quantiles is not None:
+            data = np.interp(rng.random(rows), np.linspace(0, 1, len(self.quantiles)), self.quantiles)
+            if nulls is not None:
+                data[nulls] = np.nan
+            return pd.Series(data, name=self.name)
+
+        codes = rng.choice(len(self.values), size=rows, p=self.weights)
+        if self.kind == "text":
+            codes = codes.astype(np.int32)
+            if nulls is not None:
+                codes[nulls] = -1
+            return pd.Series(pd.Categorical.from_codes(codes, categories=self.values), name=self.name)
+        data = np.asarray(self.values, dtype=np.float64 if nulls is not None or self.kind == "float" else np.int64)[codes]
+        if nulls is not None:
+            data[nulls] = np.nan
+        return pd.Series(data, name=self.name)
+
+
+def build_schema(source: Path = DEFAULT_DATASET, cardinality: Optional[Dict[str, int]] = None,
+                 null_rates: Optional[Dict[str, float]] = None) -> Dict[str, ColumnSpec]:
+    """Profile ``source`` into one ColumnSpec per column, applying any overrides."""
+    cardinality = cardinality or {}
+    null_rates = null_rates or {}
+    base = pd.read_csv(source)
+    unknown = (set(cardinality) | set(null_rates)) - set(base.columns)
+    if unknown:
+        raise ValueError(f"Unknown columns: {sorted(unknown)}")
+    return {column: ColumnSpec(column, base[column], cardinality.get(column), null_rates.get(column))
+            for column in base.columns}
+
+
+def generate_chunks(rows: int, seed: int = 0, schema: Optional[Dict[str, ColumnSpec]] = None,
+                    chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield ``rows`` synthetic rows in frames of at most ``chunk_rows`` rows."""
+    if schema is None:
+        schema = build_schema()
+    rng = np.random.default_rng(seed)
+    for start in range(0, max(rows, 1), chunk_rows):
+        size = min(chunk_rows, rows - start)
+        yield pd.DataFrame({name: spec.draw(rng, size) for name, spec in schema.items()})
+
+
+def generate(rows: int, seed: int = 0, schema: Optional[Dict[str, ColumnSpec]] = None,
+             chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """Return ``rows`` synthetic rows as one in-memory frame; text columns come out as categoricals.
+
+    Meant for the sizes the benchmark suite holds in memory; write larger
+    datasets chunk by chunk with ``write``.
+    """
+    chunks = list(generate_chunks(rows, seed, schema, chunk_rows))
+    if len(chunks) == 1:
+        return chunks[0]
+    # Chunks share their categories, so concatenation keeps the categoricals
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write(chunks: Iterator[pd.DataFrame], output: Path) -> int:
+    """Write frames to a CSV, Parquet or Arrow file one at a time; return the rows written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    suffix = output.suffix.lower()
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            if suffix in (".parquet", ".arrow", ".feather"):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    if suffix == ".parquet":
+                        writer = pq.ParquetWriter(str(output), table.schema)
+                    else:
+                        writer = pa.ipc.new_file(str(output), table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(output, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_rows, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cardinality", nargs="*", metavar="COLUMN=N")
+    parser.add_argument("--null-rate", nargs="*", metavar="COLUMN=RATE")
+    parser.add_argument("--output", type=Path, required=True, help="CSV, Parquet or Arrow file to write")
+    args = parser.parse_args()
+
+    schema = build_schema(cardinality=parse_overrides(args.cardinality, int),
+                          null_rates=parse_overrides(args.null_rate, float))
+    rows = write(generate_chunks(args.rows, args.seed, schema), args.output)
+    print(f"Wrote {rows:,} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
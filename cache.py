@@ -0,0 +1,183 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config import CACHE_SETTINGS
+from correlation import invalidate_correlation
+from excel import sheet_names
+from filters import get_mask_cache
+from ingest_pool import UploadJob, snapshot_uploads
+from store import upload_store
+from utils import clean_data
+from value_index import invalidate_index
+from viewer import invalidate_sort_index
+
+
+def content_hash(data: bytes) -> str:
+    """Return a stable hex digest for the raw bytes of an uploaded file."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Return the deep memory footprint of a dataframe in bytes."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class DatasetCache:
+    """Process-wide LRU cache of parsed dataframes keyed by dataset key.
+
+    Frames handed out by the cache are shared between reruns and sessions,
+    so callers must treat them as read-only. Eviction listeners are called
+    with the key of every frame that leaves the cache.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def add_eviction_listener(self, listener: Callable[[str], None]) -> None:
+        """Register a callback that receives the key of every evicted frame."""
+        self._listeners.append(listener)
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the cached frame for ``key`` or None, updating the counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        """Store a frame, evicting least recently used entries over budget."""
+        size = frame_nbytes(df)
+        evicted_keys = []
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            # A frame larger than the whole budget is served but never kept
+            if size <= self.max_bytes:
+                self._entries[key] = (df, size)
+                self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+                evicted_keys.append(evicted_key)
+        for evicted_key in evicted_keys:
+            for listener in self._listeners:
+                listener(evicted_key)
+
+    def clear(self) -> None:
+        """Drop every cached frame and reset the counters."""
+        with self._lock:
+            evicted_keys = list(self._entries)
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+        for evicted_key in evicted_keys:
+            for listener in self._listeners:
+                listener(evicted_key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+_dataset_cache = DatasetCache(CACHE_SETTINGS["dataset_cache_max_bytes"])
+_dataset_cache.add_eviction_listener(get_mask_cache().invalidate)
+_dataset_cache.add_eviction_listener(invalidate_index)
+_dataset_cache.add_eviction_listener(invalidate_correlation)
+_dataset_cache.add_eviction_listener(invalidate_sort_index)
+
+
+def get_dataset_cache() -> DatasetCache:
+    """Return the process-wide dataset cache."""
+    return _dataset_cache
+
+
+def _stored_frame(key: str, clean: bool, columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, str]:
+    """Return the frame (or ``columns`` of it) of an upload store snapshot through the dataset cache."""
+    frame_key = key
+    if columns is not None:
+        frame_key = f"{frame_key}-cols-{content_hash(json.dumps(list(columns)).encode())}"
+    if clean:
+        frame_key = f"{frame_key}-clean"
+    cache = get_dataset_cache()
+    df = cache.get(frame_key)
+    if df is None:
+        df = upload_store.read(key, columns)
+        if clean:
+            df = clean_data(df)
+        cache.put(frame_key, df)
+    return df, frame_key
+
+
+def load_uploaded_file(uploaded_file, clean: bool = True, sheet_name: int = 0,
+                       columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, str]:
+    """Return the parsed (and optionally cleaned) frame of an upload and its key.
+
+    The key is the content hash of the upload, suffixed with ``-clean`` for
+    cleaned frames, so it identifies the returned frame's contents. Reruns
+    with an unchanged file are served from the dataset cache without parsing,
+    and files seen in an earlier session are re-opened from their columnar
+    snapshot in the upload store. For workbooks ``sheet_name`` is the
+    position of the sheet; ``columns`` are read from the snapshot alone.
+    """
+    return load_uploaded_files([uploaded_file], clean, sheet_name, columns)[0]
+
+
+def load_uploaded_files(uploaded_files: List[Any], clean: bool = True, sheet_name: int = 0,
+                        columns: Optional[List[str]] = None) -> List[Tuple[pd.DataFrame, str]]:
+    """Load several uploads at once, like ``load_uploaded_file``.
+
+    Uploads not yet in the upload store are parsed together on the
+    ingestion process pool; each worker writes an Arrow snapshot and the
+    frames are memory-mapped from the store rather than pickled back.
+    """
+    jobs = [_upload_job(uploaded_file, sheet_name) for uploaded_file in uploaded_files]
+    snapshot_uploads(jobs)
+    return [_stored_frame(job.key, clean, columns) for job in jobs]
+
+
+def _upload_job(uploaded_file, sheet_name: int = 0) -> UploadJob:
+    data = uploaded_file.getvalue()
+    if uploaded_file.name.lower().endswith('.csv'):
+        sheet_name = 0
+    return UploadJob(data, uploaded_file.name, content_hash(data), sheet_name)
+
+
+def uploaded_sheet_names(uploaded_file) -> List[str]:
+    """Return the sheet names of an uploaded workbook (a single entry for CSV files)."""
+    if uploaded_file.name.lower().endswith('.csv'):
+        return [uploaded_file.name]
+    return sheet_names(uploaded_file.getvalue())
+
+
+def uploaded_columns(uploaded_file, sheet_name: int = 0) -> List[str]:
+    """Return the column names of an upload (sheet), converting it to a snapshot if needed."""
+    job = _upload_job(uploaded_file, sheet_name)
+    snapshot_uploads([job])
+    return [column['name'] for column in upload_store.manifest(job.key)['columns']]
@@ -0,0 +1,83 @@
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from aggregation import aggregate_by_category
+from correlation import correlation_matrix
+from cube import RollupCube
+from downsample import downsample_line, downsample_scatter, render_mode
+from instrumentation import timed
+
+CHART_TYPES = ["Line Chart", "Bar Chart", "Pie Chart", "Heatmap", "Scatter Plot", "Box Plot"]
+
+DARK_LAYOUT = dict(
+    template="plotly_dark",
+    plot_bgcolor="rgba(0,0,0,0)",
+    paper_bgcolor="rgba(0,0,0,0)",
+    font=dict(color="white")
+)
+
+
+def _aggregate(df: pd.DataFrame, category_col: str, value_col: str, agg: str,
+               cube: Optional[RollupCube]) -> pd.DataFrame:
+    data = cube.aggregate_by_category(category_col, value_col, agg) if cube is not None else None
+    return data if data is not None else aggregate_by_category(df, category_col, value_col, agg)
+
+
+@timed()
+def build_chart(df: pd.DataFrame, spec: Dict[str, Any], dataset_key: Optional[str] = None,
+                cube: Optional[RollupCube] = None) -> go.Figure:
+    """Build a dark-themed dashboard chart from a chart spec.
+
+    ``spec['type']`` is one of ``CHART_TYPES``; the other keys name the
+    columns and options the chart uses ('x', 'y', 'color', 'values', 'names',
+    'agg', 'exact', 'method') plus an optional 'title_prefix'. The
+    ``dataset_key`` of a cached dataset lets heatmaps reuse its correlation
+    statistics. Bar and pie charts are answered from the rollup ``cube`` of
+    ``df`` when it covers their columns, and from the rows otherwise.
+    """
+    chart_type = spec['type']
+    prefix = spec.get('title_prefix', '')
+
+    if chart_type == "Line Chart":
+        x_col, y_col = spec['x'], spec['y']
+        plot_df = df if spec.get('exact') else downsample_line(df, x_col, y_col)
+        fig = px.line(plot_df, x=x_col, y=y_col, title=f"{prefix}{y_col} over {x_col}",
+                      render_mode=render_mode(len(plot_df)))
+
+    elif chart_type == "Bar Chart":
+        x_col, y_col, agg = spec['x'], spec['y'], spec.get('agg', 'sum')
+        data = _aggregate(df, x_col, y_col, agg, cube)
+        fig = px.bar(data, x=x_col, y=data.columns[1], title=f"{prefix}{agg} of {y_col} by {x_col}")
+
+    elif chart_type == "Pie Chart":
+        value_col, name_col, agg = spec['values'], spec['names'], spec.get('agg', 'sum')
+        data = _aggregate(df, name_col, value_col, agg, cube)
+        fig = px.pie(data, values=data.columns[1], names=name_col,
+                     title=f"{prefix}Distribution of {value_col} ({agg})")
+
+    elif chart_type == "Heatmap":
+        method = spec.get('method', 'pearson')
+        corr = correlation_matrix(df, method=method, dataset_key=dataset_key)
+        fig = px.imshow(corr, title=f"{prefix}Correlation Heatmap ({method})")
+
+    elif chart_type == "Scatter Plot":
+        x_col, y_col, color_col = spec['x'], spec['y'], spec.get('color')
+        plot_df = df if spec.get('exact') else downsample_scatter(df, x_col, y_col, color_col=color_col)
+        fig = px.scatter(plot_df, x=x_col, y=y_col, color=color_col, title=f"{prefix}{y_col} vs {x_col}",
+                         render_mode=render_mode(len(plot_df)))
+
+    elif chart_type == "Box Plot":
+        x_col, y_col = spec.get('x'), spec['y']
+        if x_col is None:
+            fig = px.box(df, y=y_col, title=f"{prefix}Box Plot of {y_col}")
+        else:
+            fig = px.box(df, x=x_col, y=y_col, title=f"{prefix}Box Plot of {y_col} by {x_col}")
+
+    else:
+        raise ValueError(f"Unsupported chart type: {chart_type}")
+
+    fig.update_layout(**DARK_LAYOUT)
+    return fig
@@ -0,0 +1,203 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import CLEANING_SETTINGS
+from dtypes import is_categorical_column
+
+
+def _first_occurrences(hashes: np.ndarray) -> np.ndarray:
+    """Return a mask keeping the first row of every distinct hash."""
+    # A hash table pass instead of np.unique, which sorts
+    return ~pd.Series(hashes).duplicated().to_numpy()
+
+
+class RowDeduplicator:
+    """Row hashes seen so far, so duplicates are dropped across chunks.
+
+    The hashes are kept as a sorted uint64 array (8 bytes per distinct row)
+    and looked up with a binary search.
+    """
+
+    def __init__(self):
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def keep_mask(self, hashes: np.ndarray) -> np.ndarray:
+        """Return a mask of the rows whose hash has not been seen before."""
+        keep = _first_occurrences(hashes)
+        if len(self._seen):
+            positions = np.minimum(np.searchsorted(self._seen, hashes), len(self._seen) - 1)
+            keep &= self._seen[positions] != hashes
+        self._seen = np.union1d(self._seen, hashes[keep])
+        return keep
+
+
+def _normalize_series(series: pd.Series, mapping: Dict[Any, Any]) -> pd.Series:
+    """Replace the spellings in ``mapping`` with their canonical value."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        renamed = pd.Index([mapping.get(value, value) for value in categories])
+        if renamed.equals(categories):
+            return series
+        # Categories that collapse onto the same value share one code
+        category_codes, uniques = pd.factorize(renamed)
+        codes = series.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, category_codes[codes], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=uniques),
+                         index=series.index, name=series.name)
+    if not series.isin(list(mapping)).any():
+        return series
+    return series.replace(mapping)
+
+
+def _fill_series(series: pd.Series, value: Any) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories(value)
+    return series.fillna(value)
+
+
+def infer_normalizations(df: pd.DataFrame, aliases: Optional[Dict[str, Dict[Any, Any]]] = None,
+                         fold_case_columns: Optional[List[str]] = None,
+                         max_categories: Optional[int] = None) -> Dict[str, Dict[Any, Any]]:
+    """Map differently spelled values of configured text columns onto one canonical value.
+
+    Only columns with ``aliases`` (e.g. "LF" -> "Low Fat") or listed in
+    ``fold_case_columns`` are normalized; other columns are left as they
+    are. In ``fold_case_columns``, values equal up to case and surrounding
+    whitespace (after applying the aliases) are unified to their most
+    frequent spelling. The aliases are always part of the mapping so that
+    chunks profiled later are normalized the same way.
+    """
+    if aliases is None:
+        aliases = CLEANING_SETTINGS["value_aliases"]
+    if fold_case_columns is None:
+        fold_case_columns = CLEANING_SETTINGS["fold_case_columns"]
+    if max_categories is None:
+        max_categories = CLEANING_SETTINGS["normalize_max_categories"]
+
+    normalizations = {}
+    for column in df.columns:
+        series = df[column]
+        if not is_categorical_column(series):
+            continue
+        column_aliases = aliases.get(column, {})
+        if column not in fold_case_columns:
+            if column_aliases:
+                normalizations[column] = dict(column_aliases)
+            continue
+        counts = series.value_counts(dropna=True)
+        counts = counts[counts > 0]
+        if len(counts) > max_categories:
+            if column_aliases:
+                normalizations[column] = dict(column_aliases)
+            continue
+
+        # Total count of every candidate spelling, grouped by its folded form
+        groups: Dict[Any, Dict[Any, int]] = {}
+        folded_values = {}
+        for value, count in counts.items():
+            candidate = column_aliases.get(value, value)
+            if isinstance(candidate, str):
+                candidate = candidate.strip()
+            folded = candidate.casefold() if isinstance(candidate, str) else candidate
+            folded_values[value] = folded
+            spellings = groups.setdefault(folded, {})
+            spellings[candidate] = spellings.get(candidate, 0) + int(count)
+
+        mapping = dict(column_aliases)
+        for value, folded in folded_values.items():
+            spellings = groups[folded]
+            canonical = max(spellings, key=spellings.get)
+            if canonical != value:
+                mapping[value] = canonical
+        if mapping:
+            normalizations[column] = mapping
+    return normalizations
+
+
+class CleaningPlan:
+    """Reusable description of how a dataset is cleaned.
+
+    A plan holds the columns identifying duplicate rows, the value
+    normalizations of text columns and the fill value of every column. It
+    is profiled once and can then be applied to the whole dataset or to
+    each chunk of a stream, so appended data is cleaned with the same fill
+    values instead of recomputing means over everything.
+    """
+
+    def __init__(self, key_columns: List[str], fill_values: Dict[str, Any],
+                 normalizations: Dict[str, Dict[Any, Any]]):
+        self.key_columns = list(key_columns)
+        self.fill_values = dict(fill_values)
+        self.normalizations = dict(normalizations)
+
+    def normalize_and_dedup(self, df: pd.DataFrame,
+                            deduplicator: Optional[RowDeduplicator] = None) -> pd.DataFrame:
+        """Return ``df`` with normalized values and without duplicate rows.
+
+        Only normalized columns are replaced; the others are shared with
+        ``df``, which is never modified. Duplicates are found by hashing the
+        key columns of every row (a 64-bit hash per row) and, when a
+        ``deduplicator`` is given, also dropped against earlier chunks.
+        """
+        frame = df.copy(deep=False)
+        for column, mapping in self.normalizations.items():
+            if column in frame.columns:
+                series = frame[column]
+                normalized = _normalize_series(series, mapping)
+                if normalized is not series:
+                    frame[column] = normalized
+
+        key_columns = [column for column in self.key_columns if column in frame.columns]
+        if not key_columns or not len(frame):
+            return frame
+        hashes = pd.util.hash_pandas_object(frame[key_columns], index=False).to_numpy()
+        keep = deduplicator.keep_mask(hashes) if deduplicator is not None else _first_occurrences(hashes)
+        return frame if keep.all() else frame.take(np.flatnonzero(keep))
+
+    def fill(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Fill the missing values of ``frame`` with the plan's fill values, column by column."""
+        for column, value in self.fill_values.items():
+            if column in frame.columns and frame[column].hasnans:
+                frame[column] = _fill_series(frame[column], value)
+        return frame
+
+    def apply(self, df: pd.DataFrame, deduplicator: Optional[RowDeduplicator] = None) -> pd.DataFrame:
+        """Return the cleaned version of ``df`` (a whole dataset or one chunk of it)."""
+        return self.fill(self.normalize_and_dedup(df, deduplicator))
+
+
+def _profile(df: pd.DataFrame, key_columns: Optional[List[str]]) -> Tuple[CleaningPlan, pd.DataFrame]:
+    plan = CleaningPlan(key_columns if key_columns is not None else list(df.columns), {},
+                        infer_normalizations(df))
+    deduped = plan.normalize_and_dedup(df)
+
+    for column in deduped.columns:
+        series = deduped[column]
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            mean = series.mean()
+            if pd.notna(mean):
+                plan.fill_values[column] = float(mean)
+        elif is_categorical_column(series):
+            plan.fill_values[column] = CLEANING_SETTINGS["text_fill_value"]
+    return plan, deduped
+
+
+def profile_cleaning(df: pd.DataFrame, key_columns: Optional[List[str]] = None) -> CleaningPlan:
+    """Profile ``df`` into a cleaning plan.
+
+    Numeric columns are filled with their mean over the deduplicated rows
+    and text columns with the configured text fill value. ``key_columns``
+    default to all columns, i.e. only fully identical rows are duplicates.
+    """
+    return _profile(df, key_columns)[0]
+
+
+def clean_frame(df: pd.DataFrame, key_columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, CleaningPlan]:
+    """Profile and clean ``df`` in one pass, returning the cleaned frame and its plan."""
+    plan, deduped = _profile(df, key_columns)
+    return plan.fill(deduped), plan
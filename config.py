@@ -46,7 +46,11 @@ USER_ROLES = {
 # File upload settings
 UPLOAD_SETTINGS = {
     "allowed_extensions": [".csv", ".xlsx", ".xls"],
-    "max_file_size": 10 * 1024 * 1024  # 10MB
+    "max_file_size": 500 * 1024 * 1024,  # 500MB, keep in sync with .streamlit/config.toml
+    "quick_max_file_size": 200 * 1024 * 1024,  # top-level uploader, which loads the whole file
+    "stream_threshold": 10 * 1024 * 1024,  # CSVs above 10MB are streamed in chunks
+    "chunk_rows": 100_000,
+    "summary_cache_entries": 16
 }
 
 # Visualization settings
@@ -54,13 +58,110 @@ VIZ_SETTINGS = {
     "default_chart_height": 500,
     "default_chart_width": 800,
     "color_palette": "plotly",
-    "template": "plotly_white"
+    "template": "plotly_white",
+    "aggregate_top_n": 30,  # categories shown before folding the rest into "Other"
+    "downsample_points_per_pixel": 2,  # line chart points kept per pixel of chart width
+    "webgl_threshold": 5000,  # traces with more points render with WebGL
+    "correlation_block_rows": 65536  # rows per block when computing correlations
 }
 
 # Export settings
+EXPORT_DIR = DATA_DIR / "exports"
+
 EXPORT_SETTINGS = {
-    "allowed_formats": ["csv", "excel", "png", "pdf"],
-    "default_format": "csv"
+    "allowed_formats": ["csv", "excel", "parquet", "png", "pdf"],
+    "default_format": "csv",
+    "chunk_rows": 50_000,  # rows formatted at a time while writing exports
+    "cache_max_bytes": 1024 * 1024 * 1024  # 1GB of generated export files
+}
+
+# Default Home page dataset
+DEFAULT_DATASET = BASE_DIR / "Test.csv"
+
+# Dataset storage settings
+DATASET_SETTINGS = {
+    "category_max_ratio": 0.5,  # max distinct/rows ratio for categorical columns
+    "schema_sample_rows": 10000,  # rows read to infer the compact schema
+    "csv_engine": "pyarrow",  # pandas CSV engine ("c" or "pyarrow")
+    "excel_engine": "auto",  # "calamine" (python-calamine), "openpyxl" or "auto"
+    "excel_chunk_rows": 100_000,  # workbook rows held as Python objects at a time
+    "upload_store_max_bytes": 2 * 1024 * 1024 * 1024  # 2GB of upload snapshots on disk
+}
+
+# Cleaning settings
+CLEANING_SETTINGS = {
+    "text_fill_value": "Unknown",  # fill value of missing text values
+    "normalize_max_categories": 1000,  # text columns with more distinct values are not case-folded
+    # Columns whose values equal up to case and whitespace are unified to the most frequent spelling
+    "fold_case_columns": ["Item_Fat_Content"],
+    # Known spellings of the same value, on top of case/whitespace unification
+    "value_aliases": {
+        "Item_Fat_Content": {"LF": "Low Fat", "low fat": "Low Fat", "reg": "Regular"}
+    }
+}
+
+# Asset settings
+ASSET_SETTINGS = {
+    "logo_url": "https://lookaside.fbsbx.com/lookaside/crawler/media/?media_id=100066162236707",
+    "logo_path": STATIC_DATA_DIR / "assets" / "logo",
+    "timeout": 5,  # seconds a background download may take
+    "refresh_interval": 24 * 3600,  # re-download the local copy once a day
+    "retry_interval": 300  # wait 5 minutes after a failed download
+}
+
+# Rollup cube of the Home dataset, answering bar and pie charts without scanning rows
+CUBE_SETTINGS = {
+    "dimensions": ["Item_Type", "Item_Fat_Content", "Outlet_Identifier", "Outlet_Size",
+                   "Outlet_Location_Type", "Outlet_Type", "Outlet_Establishment_Year"],
+    "measures": ["Item_MRP", "Item_Weight", "Item_Visibility"],
+    "cube_entries": 4  # datasets whose cube is kept
+}
+
+# Chart rendering settings
+RENDER_SETTINGS = {
+    "max_workers": 4  # threads preparing charts in parallel
+}
+
+# Parallel ingestion settings
+INGEST_SETTINGS = {
+    "max_workers": 2,  # worker processes parsing uploads
+    "parallel_min_bytes": 5 * 1024 * 1024  # smaller batches are parsed in the script thread
+}
+
+# Dataset comparison settings
+COMPARISON_SETTINGS = {
+    "chunk_rows": 250_000,  # matched rows compared at a time
+    "preview_rows": 100,  # changed values / added / removed rows shown per section
+    "cache_entries": 8,  # dataset pairs whose diff is kept
+    "default_key_columns": ["Item_Identifier", "Outlet_Identifier"]
+}
+
+# Dataset cache settings
+CACHE_SETTINGS = {
+    "dataset_cache_max_bytes": 512 * 1024 * 1024,  # 512MB
+    "figure_cache_max_bytes": 64 * 1024 * 1024,  # 64MB of serialized figure JSON
+    "correlation_entries": 16  # datasets whose correlation statistics are kept
+}
+
+# Filter settings
+FILTER_SETTINGS = {
+    "mask_cache_max_bytes": 64 * 1024 * 1024,  # 64MB
+    "value_index_entries": 8,  # datasets whose value index is kept
+    "max_multiselect_options": 50,  # larger columns get a search filter instead
+    "search_result_limit": 100
+}
+
+# Raw data viewer settings
+VIEWER_SETTINGS = {
+    "page_sizes": [50, 100, 500],  # rows per page offered in the viewer
+    "sort_index_entries": 32  # dataset columns whose sort order is kept
+}
+
+# SQL query settings
+QUERY_SETTINGS = {
+    "max_result_rows": 1_000_000,  # rows fetched from a query result
+    "batch_rows": 100_000,  # rows per fetched record batch
+    "default_sql": "SELECT Outlet_Type, COUNT(*) AS items, AVG(Item_MRP) AS avg_mrp\nFROM home\nGROUP BY Outlet_Type\nORDER BY items DESC"
 }
 
 # Session settings
@@ -74,9 +175,11 @@ LOGGING_SETTINGS = {
     "log_file": BASE_DIR / "logs" / "app.log",
     "log_level": "INFO",
     "max_file_size": 5 * 1024 * 1024,  # 5MB
-    "backup_count": 5
+    "backup_count": 5,
+    "instrumentation_enabled": True,  # record per-stage timings to the log
+    "latency_window": 500  # recent samples per stage and page kept for percentiles
 }
 
 # Create necessary directories
-for directory in [DATA_DIR, STATIC_DATA_DIR, USER_DATA_DIR, BASE_DIR / "logs"]:
+for directory in [DATA_DIR, STATIC_DATA_DIR, USER_DATA_DIR, EXPORT_DIR, BASE_DIR / "logs"]:
     directory.mkdir(exist_ok=True) 
\ No newline at end of file
@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import CACHE_SETTINGS, VIZ_SETTINGS
+
+METHODS = ["pearson", "spearman"]
+
+
+def numeric_columns(df: pd.DataFrame) -> List[str]:
+    """Return the columns a correlation matrix is computed over."""
+    return list(df.select_dtypes(include=[np.number]).columns)
+
+
+class CorrelationStats:
+    """Sufficient statistics for pairwise-complete Pearson correlation.
+
+    For every column pair the count of rows where both are present and the
+    sums, sums of squares and cross-products over those rows are kept as
+    k x k matrices, so rows can be folded in chunk by chunk and the matrix
+    read off at any time. Values are shifted by the first chunk's column
+    means to keep the sums numerically stable.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold a (rows x columns) float array with NaN for missing values."""
+        if not len(values):
+            return
+        present = ~np.isnan(values)
+        if self.shift is None:
+            counts = present.sum(axis=0)
+            sums = np.where(present, values, 0.0).sum(axis=0)
+            self.shift = np.divide(sums, counts, out=np.zeros(len(self.columns)), where=counts > 0)
+
+        x = np.where(present, values - self.shift, 0.0)
+        if present.all():
+            # Without missing values every pair sees every row, so only x.T @ x needs a matmul
+            self.n += len(x)
+            self.sx += x.sum(axis=0)[:, None]
+            self.sxx += (x * x).sum(axis=0)[:, None]
+            self.sxy += x.T @ x
+            return
+        m = present.astype(np.float64)
+        # sx[i, j] is the sum of column i over rows where column j is also present
+        self.n += m.T @ m
+        self.sx += x.T @ m
+        self.sxx += (x * x).T @ m
+        self.sxy += x.T @ x
+
+    def update_frame(self, df: pd.DataFrame) -> None:
+        """Fold the rows of a frame holding (at least) the tracked columns."""
+        self.update(df[self.columns].to_numpy(dtype='float64', na_value=np.nan))
+
+    def corr(self) -> pd.DataFrame:
+        """Return the correlation matrix of all rows folded in so far."""
+        n, sx, sxx = self.n, self.sx, self.sxx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = n * self.sxy - sx * sx.T
+            var_i = n * sxx - sx * sx
+            corr = cov / np.sqrt(var_i * var_i.T)
+        corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _iter_blocks(df: pd.DataFrame, columns: List[str], mask: Optional[np.ndarray],
+                 block_rows: int) -> Iterator[np.ndarray]:
+    """Yield float blocks of the selected rows without materializing the subset."""
+    positions = df.columns.get_indexer(columns)
+    for start in range(0, len(df), block_rows):
+        block = df.iloc[start:start + block_rows, positions].to_numpy(dtype='float64', na_value=np.nan)
+        if mask is not None:
+            block = block[mask[start:start + block_rows]]
+        yield block
+
+
+def pearson_stats(df: pd.DataFrame, columns: Optional[List[str]] = None,
+                  mask: Optional[np.ndarray] = None) -> CorrelationStats:
+    """Compute the correlation statistics of ``df`` (or of the rows in ``mask``)."""
+    if columns is None:
+        columns = numeric_columns(df)
+    stats = CorrelationStats(columns)
+    for block in _iter_blocks(df, columns, mask, VIZ_SETTINGS["correlation_block_rows"]):
+        stats.update(block)
+    return stats
+
+
+def spearman(df: pd.DataFrame, columns: Optional[List[str]] = None,
+             mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Spearman correlation: Pearson over per-column average ranks.
+
+    Ranks depend on every selected row, so unlike Pearson this cannot be
+    updated incrementally. Each column is ranked over its non-null values.
+    """
+    if columns is None:
+        columns = numeric_columns(df)
+    subset = df[columns] if mask is None else df.loc[mask, columns]
+    ranks = subset.rank(method='average')
+    stats = CorrelationStats(columns)
+    stats.update(ranks.to_numpy(dtype='float64', na_value=np.nan))
+    return stats.corr()
+
+
+_full_stats: "OrderedDict[str, CorrelationStats]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def correlation_matrix(df: pd.DataFrame, method: str = 'pearson', mask: Optional[np.ndarray] = None,
+                       dataset_key: Optional[str] = None) -> pd.DataFrame:
+    """Return the correlation matrix of the numeric columns of ``df``.
+
+    ``mask`` restricts the computation to a filtered subset of the rows.
+    Pearson statistics of a whole dataset identified by ``dataset_key`` are
+    computed once and reused.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported correlation method: {method}")
+    if method == 'spearman':
+        return spearman(df, mask=mask)
+    if mask is not None or dataset_key is None:
+        return pearson_stats(df, mask=mask).corr()
+
+    with _lock:
+        stats = _full_stats.get(dataset_key)
+        if stats is not None:
+            _full_stats.move_to_end(dataset_key)
+    if stats is None:
+        stats = pearson_stats(df)
+        with _lock:
+            _full_stats[dataset_key] = stats
+            while len(_full_stats) > CACHE_SETTINGS["correlation_entries"]:
+                _full_stats.popitem(last=False)
+    return stats.corr()
+
+
+def invalidate_correlation(dataset_key: str) -> None:
+    """Drop the cached statistics of a dataset that is no longer cached."""
+    with _lock:
+        _full_stats.pop(dataset_key, None)
@@ -0,0 +1,143 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from aggregation import _is_measure, fold_partials
+from config import CUBE_SETTINGS, VIZ_SETTINGS
+
+STATISTICS = ["count", "sum", "min", "max"]
+
+
+def _code_dtype(n_values: int) -> np.dtype:
+    # Signed, so that -1 can mark missing values
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class RollupCube:
+    """Count, sum, min and max of the measures per combination of the dimensions.
+
+    Dimension values are stored as integer codes (numbered in order of first
+    appearance, -1 for missing values) with one row per combination present
+    in the data, so any rollup over a subset of the dimensions reads the
+    cube's cells instead of the dataset's rows.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensions: List[str], measures: List[str]):
+        self.dimensions = [column for column in dimensions if column in df.columns]
+        self.measures = [column for column in measures if column in df.columns and _is_measure(df[column])]
+        # Dimensions that aggregate_by_category could only count
+        self._countable = {column for column in self.dimensions if not _is_measure(df[column])}
+        self.n_rows = len(df)
+
+        self.labels = {}
+        codes = {}
+        for column in self.dimensions:
+            column_codes, uniques = pd.factorize(df[column])
+            # A trailing NaN label lets code -1 index the missing value
+            self.labels[column] = np.append(np.asarray(uniques, dtype=object), np.nan)
+            codes[column] = column_codes.astype(_code_dtype(len(uniques)))
+
+        values = pd.DataFrame({measure: df[measure].to_numpy(dtype=np.float64, na_value=np.nan)
+                               for measure in self.measures})
+        values['rows'] = 1
+        grouped = values.groupby([codes[column] for column in self.dimensions], sort=False)
+        cells = grouped[self.measures].agg(STATISTICS)
+        cells.columns = [f"{measure}_{statistic}" for measure, statistic in cells.columns]
+        cells['rows'] = grouped['rows'].sum().astype(np.int64)
+
+        cells.index.names = self.dimensions
+        self.cells = cells.reset_index()
+        for column in self.dimensions:
+            self.cells[column] = self.cells[column].astype(codes[column].dtype)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.cells.memory_usage(index=False).sum())
+
+    def rollup(self, dimensions: List[str], measure: str) -> pd.DataFrame:
+        """Return count, sum, min and max of ``measure`` per combination of ``dimensions``.
+
+        The result is indexed by the dimension values, in order of first
+        appearance in the dataset.
+        """
+        grouped = self.cells.groupby(dimensions, sort=False)
+        partials = pd.DataFrame({
+            'count': grouped[f"{measure}_count"].sum(),
+            'sum': grouped[f"{measure}_sum"].sum(),
+            'min': grouped[f"{measure}_min"].min(),
+            'max': grouped[f"{measure}_max"].max()
+        })
+        return self._label(partials, dimensions)
+
+    def row_counts(self, dimensions: List[str], present: Optional[str] = None) -> pd.DataFrame:
+        """Return the number of rows per combination of ``dimensions``.
+
+        With ``present``, only rows where that dimension is not missing are
+        counted, like ``count`` of a non-numeric column.
+        """
+        rows = self.cells['rows']
+        if present is not None:
+            rows = rows.where(self.cells[present] >= 0, 0)
+        counts = rows.groupby([self.cells[column] for column in dimensions], sort=False).sum()
+        return self._label(pd.DataFrame({'count': counts}), dimensions)
+
+    def _label(self, partials: pd.DataFrame, dimensions: List[str]) -> pd.DataFrame:
+        levels = [self.labels[column][partials.index.get_level_values(column)] for column in dimensions]
+        if len(dimensions) == 1:
+            partials.index = pd.Index(levels[0], dtype=object, name=dimensions[0])
+        else:
+            partials.index = pd.MultiIndex.from_arrays(levels, names=dimensions)
+        return partials
+
+    def aggregate_by_category(self, category_col: str, value_col: str, reducer: str = "sum",
+                              top_n: Optional[int] = None, other_label: str = "Other") -> Optional[pd.DataFrame]:
+        """Answer ``aggregation.aggregate_by_category`` from the cube.
+
+        Returns the same frame the row scan would, or None when the cube
+        cannot answer the query (a column outside the cube or a median).
+        """
+        if category_col not in self.dimensions or reducer == "median":
+            return None
+        if top_n is None:
+            top_n = VIZ_SETTINGS["aggregate_top_n"]
+
+        if value_col in self.measures:
+            partials = self.rollup([category_col], value_col)
+        elif value_col in self._countable:
+            reducer = "count"
+            partials = self.row_counts([category_col], present=value_col)
+        else:
+            return None
+
+        result = fold_partials(partials, reducer, top_n, other_label)
+        value_name = value_col if value_col != category_col else f"{reducer} of {value_col}"
+        result.index = pd.Index(result.index.astype(object), name=category_col)
+        return result.rename(columns={"value": value_name}).reset_index()
+
+
+_cubes: "OrderedDict[str, RollupCube]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_cube(df: pd.DataFrame, dataset_key: str) -> RollupCube:
+    """Return the rollup cube of a dataset, building it once per dataset key."""
+    with _lock:
+        if dataset_key in _cubes:
+            _cubes.move_to_end(dataset_key)
+            return _cubes[dataset_key]
+
+    cube = RollupCube(df, CUBE_SETTINGS["dimensions"], CUBE_SETTINGS["measures"])
+    with _lock:
+        _cubes[dataset_key] = cube
+        while len(_cubes) > CUBE_SETTINGS["cube_entries"]:
+            _cubes.popitem(last=False)
+    return cube
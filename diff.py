@@ -0,0 +1,260 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import COMPARISON_SETTINGS
+
+
+def _chunk_bounds(n: int, chunk_rows: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, n, chunk_rows):
+        yield start, min(start + chunk_rows, n)
+
+
+def _is_numeric_key(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def key_dtypes(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: List[str]) -> Dict[str, str]:
+    """Return the dtype numeric key columns are hashed as in both datasets.
+
+    Keys numeric on both sides are hashed as int64, or as float64 when
+    either side is a float (or nullable) column, so 7 and 7.0 match.
+    """
+    dtypes = {}
+    for column in key_columns:
+        pair = (df1[column].dtype, df2[column].dtype)
+        if all(_is_numeric_key(dtype) for dtype in pair):
+            widen = any(pd.api.types.is_float_dtype(dtype) or pd.api.types.is_extension_array_dtype(dtype)
+                        for dtype in pair)
+            dtypes[column] = 'float64' if widen else 'int64'
+    return dtypes
+
+
+def key_hashes(df: pd.DataFrame, key_columns: List[str], chunk_rows: int,
+               dtypes: Optional[Dict[str, str]] = None) -> np.ndarray:
+    """Return a 64-bit hash of the key of every row, hashed chunk by chunk.
+
+    Hashes depend only on the values, so categorical and text keys hash
+    alike. Numeric keys are cast to ``dtypes`` first (see ``key_dtypes``),
+    since an integer and a float holding the same number hash differently.
+    """
+    hashes = np.empty(len(df), dtype=np.uint64)
+    positions = df.columns.get_indexer(key_columns)
+    casts = {column: dtype for column, dtype in (dtypes or {}).items() if df[column].dtype != dtype}
+    for start, end in _chunk_bounds(len(df), chunk_rows):
+        keys = df.iloc[start:end, positions]
+        if casts:
+            keys = keys.astype(casts)
+        hashes[start:end] = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return hashes
+
+
+class _ColumnComparer:
+    """Compares one column of two datasets at given row positions.
+
+    Categorical columns are compared on codes remapped to the union of both
+    category sets, numeric columns as float64 and anything else as objects.
+    Two missing values compare equal.
+    """
+
+    def __init__(self, s1: pd.Series, s2: pd.Series):
+        self.s1, self.s2 = s1, s2
+        self.categorical = (isinstance(s1.dtype, pd.CategoricalDtype)
+                            and isinstance(s2.dtype, pd.CategoricalDtype))
+        self.numeric = all(
+            pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype)
+            for s in (s1, s2)
+        )
+        if self.categorical:
+            union = s1.cat.categories.union(s2.cat.categories)
+            # Append -1 so missing values (code -1) stay missing after remapping
+            self.map1 = np.append(union.get_indexer(s1.cat.categories), -1)
+            self.map2 = np.append(union.get_indexer(s2.cat.categories), -1)
+            self.codes1 = s1.cat.codes.to_numpy()
+            self.codes2 = s2.cat.codes.to_numpy()
+
+    def changed(self, p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
+        """Return a mask of the position pairs whose values differ."""
+        if self.categorical:
+            return self.map1[self.codes1[p1]] != self.map2[self.codes2[p2]]
+        if self.numeric:
+            a = self.s1.iloc[p1].to_numpy(dtype='float64', na_value=np.nan)
+            b = self.s2.iloc[p2].to_numpy(dtype='float64', na_value=np.nan)
+            return (a != b) & ~(np.isnan(a) & np.isnan(b))
+        a = self.s1.iloc[p1].to_numpy(dtype=object)
+        b = self.s2.iloc[p2].to_numpy(dtype=object)
+        return (a != b) & ~(pd.isna(a) & pd.isna(b))
+
+
+class DatasetDiff:
+    """Row-level differences between two datasets aligned on key columns.
+
+    Matched rows are kept as pairs of row positions (``pairs1``, ``pairs2``)
+    and changes are stored sparsely: for every compared column the indices
+    of the matched pairs whose value changed. Added and removed rows are
+    row positions in the second and first dataset respectively.
+    """
+
+    def __init__(self, key_columns: List[str], compared_columns: List[str], rows1: int, rows2: int,
+                 pairs1: np.ndarray, pairs2: np.ndarray, added: np.ndarray, removed: np.ndarray,
+                 changes: Dict[str, np.ndarray], duplicate_keys1: int, duplicate_keys2: int):
+        self.key_columns = key_columns
+        self.compared_columns = compared_columns
+        self.rows1 = rows1
+        self.rows2 = rows2
+        self.pairs1 = pairs1
+        self.pairs2 = pairs2
+        self.added = added
+        self.removed = removed
+        self.changes = changes
+        self.duplicate_keys1 = duplicate_keys1
+        self.duplicate_keys2 = duplicate_keys2
+        self.changed_pairs = (np.unique(np.concatenate(list(changes.values())))
+                              if changes else np.empty(0, dtype=np.int64))
+
+    def column_changes(self) -> pd.Series:
+        """Return the number of changed values per compared column."""
+        return pd.Series({column: len(self.changes[column]) for column in self.compared_columns},
+                         dtype='int64')
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the row and cell counts of the diff."""
+        return {
+            'key_columns': self.key_columns,
+            'rows1': self.rows1,
+            'rows2': self.rows2,
+            'matched_rows': len(self.pairs1),
+            'added_rows': len(self.added),
+            'removed_rows': len(self.removed),
+            'changed_rows': len(self.changed_pairs),
+            'unchanged_rows': len(self.pairs1) - len(self.changed_pairs),
+            'changed_values': int(sum(len(pairs) for pairs in self.changes.values())),
+            'duplicate_keys1': self.duplicate_keys1,
+            'duplicate_keys2': self.duplicate_keys2
+        }
+
+    def changed_values(self, df1: pd.DataFrame, df2: pd.DataFrame, limit: Optional[int] = None) -> pd.DataFrame:
+        """Return changed cells in long format: key columns, column, old and new value.
+
+        Only the first ``limit`` changes of each column are materialized.
+        Without key columns rows are identified by their position ('row').
+        """
+        if limit is None:
+            limit = COMPARISON_SETTINGS["preview_rows"]
+        parts = []
+        for column, pairs in self.changes.items():
+            pairs = pairs[:limit]
+            if not len(pairs):
+                continue
+            if self.key_columns:
+                part = df2.iloc[self.pairs2[pairs]][self.key_columns].reset_index(drop=True)
+            else:
+                part = pd.DataFrame({'row': self.pairs2[pairs]})
+            part['column'] = column
+            part['old_value'] = df1[column].iloc[self.pairs1[pairs]].to_numpy(dtype=object)
+            part['new_value'] = df2[column].iloc[self.pairs2[pairs]].to_numpy(dtype=object)
+            parts.append(part)
+        if not parts:
+            return pd.DataFrame(columns=(self.key_columns or ['row']) + ['column', 'old_value', 'new_value'])
+        return pd.concat(parts, ignore_index=True)
+
+    def added_rows(self, df2: pd.DataFrame, limit: Optional[int] = None) -> pd.DataFrame:
+        """Return (up to ``limit``) rows of the second dataset missing from the first."""
+        if limit is None:
+            limit = COMPARISON_SETTINGS["preview_rows"]
+        return df2.iloc[self.added[:limit]]
+
+    def removed_rows(self, df1: pd.DataFrame, limit: Optional[int] = None) -> pd.DataFrame:
+        """Return (up to ``limit``) rows of the first dataset missing from the second."""
+        if limit is None:
+            limit = COMPARISON_SETTINGS["preview_rows"]
+        return df1.iloc[self.removed[:limit]]
+
+
+def _align(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: Optional[List[str]],
+           chunk_rows: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int, int]:
+    """Return matched position pairs, added and removed positions and duplicate key counts."""
+    n1, n2 = len(df1), len(df2)
+    if not key_columns:
+        # Positional alignment
+        n = min(n1, n2)
+        return np.arange(n), np.arange(n), np.arange(n, n2), np.arange(n, n1), 0, 0
+
+    dtypes = key_dtypes(df1, df2, key_columns)
+    h1 = key_hashes(df1, key_columns, chunk_rows, dtypes)
+    h2 = key_hashes(df2, key_columns, chunk_rows, dtypes)
+    # Rows with a repeated key are matched by their first occurrence only
+    first1 = ~pd.Series(h1).duplicated().to_numpy()
+    first2 = ~pd.Series(h2).duplicated().to_numpy()
+    positions1 = np.flatnonzero(first1)
+    positions2 = np.flatnonzero(first2)
+
+    # Hash join: probe the first dataset's key hash table with the second's keys
+    matches = pd.Index(h1[positions1]).get_indexer(h2[positions2])
+    found = matches >= 0
+    pairs1 = positions1[matches[found]]
+    pairs2 = positions2[found]
+
+    matched1 = np.zeros(n1, dtype=bool)
+    matched1[pairs1] = True
+    removed = np.flatnonzero(first1 & ~matched1)
+    added = positions2[~found]
+    return pairs1, pairs2, added, removed, n1 - len(positions1), n2 - len(positions2)
+
+
+def diff_datasets(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: Optional[List[str]] = None,
+                  chunk_rows: Optional[int] = None) -> DatasetDiff:
+    """Diff two datasets, aligning rows on ``key_columns`` (or by position when None).
+
+    Rows are matched with a hash join on 64-bit key hashes; rows of the
+    second dataset without a match are added and rows of the first without
+    a match are removed. The common non-key columns of matched rows are
+    compared ``chunk_rows`` pairs at a time, so no full-size comparison
+    matrix is ever built. The datasets may differ in shape and columns.
+    """
+    if chunk_rows is None:
+        chunk_rows = COMPARISON_SETTINGS["chunk_rows"]
+    key_columns = list(key_columns or [])
+    missing = [column for column in key_columns if column not in df1.columns or column not in df2.columns]
+    if missing:
+        raise ValueError(f"Key columns missing from a dataset: {missing}")
+
+    pairs1, pairs2, added, removed, duplicates1, duplicates2 = _align(df1, df2, key_columns, chunk_rows)
+
+    compared = [column for column in df1.columns if column in df2.columns and column not in key_columns]
+    changes = {}
+    for column in compared:
+        comparer = _ColumnComparer(df1[column], df2[column])
+        changed = [
+            start + np.flatnonzero(comparer.changed(pairs1[start:end], pairs2[start:end]))
+            for start, end in _chunk_bounds(len(pairs1), chunk_rows)
+        ]
+        changes[column] = np.concatenate(changed) if changed else np.empty(0, dtype=np.int64)
+
+    return DatasetDiff(key_columns, compared, len(df1), len(df2), pairs1, pairs2, added, removed,
+                       changes, duplicates1, duplicates2)
+
+
+_diff_cache: "OrderedDict[Tuple[str, str, Tuple[str, ...]], DatasetDiff]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_diff(df1: pd.DataFrame, key1: str, df2: pd.DataFrame, key2: str,
+             key_columns: Optional[List[str]] = None) -> DatasetDiff:
+    """Return the diff of two cached datasets, computing it once per key choice."""
+    cache_key = (key1, key2, tuple(key_columns or []))
+    with _lock:
+        diff = _diff_cache.get(cache_key)
+        if diff is not None:
+            _diff_cache.move_to_end(cache_key)
+            return diff
+
+    diff = diff_datasets(df1, df2, key_columns)
+    with _lock:
+        _diff_cache[cache_key] = diff
+        while len(_diff_cache) > COMPARISON_SETTINGS["cache_entries"]:
+            _diff_cache.popitem(last=False)
+    return diff
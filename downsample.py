@@ -0,0 +1,127 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from config import VIZ_SETTINGS
+
+
+def _is_plottable_measure(series: pd.Series) -> bool:
+    return (
+        pd.api.types.is_datetime64_any_dtype(series.dtype)
+        or (pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype))
+    )
+
+
+def _numeric_axis(series: pd.Series) -> np.ndarray:
+    """Return x positions for bucketing: numeric values, datetimes as ints or row order."""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.to_numpy(dtype='datetime64[ns]').view('int64').astype('float64')
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype='float64', na_value=np.nan)
+    return np.arange(len(series), dtype='float64')
+
+
+def target_points(width: Optional[int] = None) -> int:
+    """Return how many points a chart of ``width`` pixels can usefully show."""
+    if width is None:
+        width = VIZ_SETTINGS["default_chart_width"]
+    return int(width * VIZ_SETTINGS["downsample_points_per_pixel"])
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-triangle-three-buckets: positions of ``n_out`` points keeping the line's shape.
+
+    The first and last points are always kept. Every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the average of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_buckets: int,
+                   groups: Optional[np.ndarray] = None) -> np.ndarray:
+    """Positions of the min and max ``y`` in each of ``n_buckets`` equal-width x buckets.
+
+    When ``groups`` codes are given (e.g. a color column) each group keeps its
+    own extremes per bucket.
+    """
+    if not len(x):
+        return np.arange(0)
+    span = x.max() - x.min()
+    if span > 0:
+        buckets = np.minimum(((x - x.min()) / span * n_buckets).astype(np.int64), n_buckets - 1)
+    else:
+        buckets = np.zeros(len(x), dtype=np.int64)
+    if groups is not None:
+        buckets = groups.astype(np.int64) * n_buckets + buckets
+
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    boundaries = np.flatnonzero(np.diff(sorted_buckets)) + 1
+    firsts = np.concatenate([[0], boundaries])
+    lasts = np.concatenate([boundaries - 1, [len(order) - 1]])
+    return np.unique(np.concatenate([order[firsts], order[lasts]]))
+
+
+def downsample_line(df: pd.DataFrame, x_col: str, y_col: str, max_points: Optional[int] = None) -> pd.DataFrame:
+    """Return at most ``max_points`` rows of ``df`` chosen by LTTB, in their original order.
+
+    Frames whose y column is not numeric are returned unchanged.
+    """
+    if max_points is None:
+        max_points = target_points()
+    if len(df) <= max_points or not _is_plottable_measure(df[y_col]):
+        return df
+    x = _numeric_axis(df[x_col])
+    y = _numeric_axis(df[y_col])
+    valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    keep = valid[lttb_indices(x[valid], y[valid], max_points)]
+    return df.iloc[keep]
+
+
+def downsample_scatter(df: pd.DataFrame, x_col: str, y_col: str, n_buckets: Optional[int] = None,
+                       color_col: Optional[str] = None) -> pd.DataFrame:
+    """Return the rows holding the min and max ``y`` of every x pixel bucket.
+
+    Frames whose y column is not numeric are returned unchanged.
+    """
+    if n_buckets is None:
+        n_buckets = VIZ_SETTINGS["default_chart_width"]
+    if len(df) <= 2 * n_buckets or not _is_plottable_measure(df[y_col]):
+        return df
+    x = _numeric_axis(df[x_col])
+    y = _numeric_axis(df[y_col])
+    valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    if not len(valid):
+        return df.iloc[valid]
+    groups = None
+    if color_col is not None and color_col not in (x_col, y_col):
+        groups = pd.factorize(df[color_col])[0][valid]
+    keep = valid[minmax_indices(x[valid], y[valid], n_buckets, groups)]
+    return df.iloc[keep]
+
+
+def render_mode(n_points: int) -> str:
+    """Use WebGL (scattergl) rendering for traces above the configured size."""
+    return 'webgl' if n_points > VIZ_SETTINGS["webgl_threshold"] else 'svg'
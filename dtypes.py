@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from config import DATASET_SETTINGS
+
+
+def is_categorical_column(series: pd.Series) -> bool:
+    """Return True for text-like columns (object, string or categorical)."""
+    return (
+        isinstance(series.dtype, pd.CategoricalDtype)
+        or pd.api.types.is_object_dtype(series.dtype)
+        or pd.api.types.is_string_dtype(series.dtype)
+    )
+
+
+# Value kinds of object columns that Arrow cannot store as a single type
+MIXED_KINDS = {'mixed', 'mixed-integer'}
+
+
+def stringify_mixed(series: pd.Series) -> pd.Series:
+    """Return a text column mixing value types (common in Excel sheets) as strings, keeping nulls."""
+    values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series
+    if not pd.api.types.is_object_dtype(values.dtype):
+        return series
+    if pd.api.types.infer_dtype(values, skipna=True) not in MIXED_KINDS:
+        return series
+    series = series.astype(object)
+    return series.where(series.isna(), series.astype(str))
+
+
+def narrow_float(series: pd.Series) -> pd.Series:
+    """Return a float64 series as float32 when every value survives the round-trip exactly."""
+    if series.dtype != np.float64:
+        return series
+    values = series.to_numpy()
+    narrowed = values.astype(np.float32)
+    if not np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+        return series
+    return pd.Series(narrowed, index=series.index, name=series.name)
+
+
+def optimize_dtypes(df: pd.DataFrame, category_max_ratio: float = None) -> pd.DataFrame:
+    """Return a copy of the dataframe with compact dtypes.
+
+    Text columns mixing value types are converted to strings, so the frame
+    can be stored as Arrow. Low-cardinality text columns become categoricals,
+    integer columns are downcast to the smallest type that holds their values
+    and float columns become float32 only when no value loses precision.
+    """
+    if category_max_ratio is None:
+        category_max_ratio = DATASET_SETTINGS["category_max_ratio"]
+
+    # Columns are replaced by position, so non-string and duplicate names work too
+    result = df.copy()
+    for position in range(len(df.columns)):
+        series = df.iloc[:, position]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if is_categorical_column(series):
+            text = stringify_mixed(series)
+            if isinstance(text.dtype, pd.CategoricalDtype):
+                continue
+            if len(text) and text.nunique(dropna=True) <= category_max_ratio * len(text):
+                result.isetitem(position, text.astype('category'))
+            elif text is not series:
+                result.isetitem(position, text)
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            downcast = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+            result.isetitem(position, pd.to_numeric(series, downcast=downcast))
+        elif pd.api.types.is_float_dtype(series.dtype):
+            result.isetitem(position, narrow_float(series))
+    return result
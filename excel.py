@@ -0,0 +1,94 @@
+import importlib.util
+import io
+from itertools import zip_longest
+from typing import List, Optional, Union
+
+import pandas as pd
+
+from config import DATASET_SETTINGS
+
+SheetRef = Union[int, str]
+
+
+def excel_engine() -> str:
+    """Return the engine used for workbooks: calamine when installed, else openpyxl."""
+    engine = DATASET_SETTINGS["excel_engine"]
+    if engine == "auto":
+        return "calamine" if importlib.util.find_spec("python_calamine") is not None else "openpyxl"
+    return engine
+
+
+def _as_source(source):
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source
+
+
+def sheet_names(source) -> List[str]:
+    """Return the sheet names of a workbook without reading any cells."""
+    if excel_engine() == "calamine":
+        return list(pd.ExcelFile(_as_source(source), engine="calamine").sheet_names)
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(_as_source(source), read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _header_names(header) -> List[str]:
+    return [f"Unnamed: {i}" if name is None else str(name) for i, name in enumerate(header)]
+
+
+def _read_openpyxl(source, sheet_name: SheetRef, columns: Optional[List[str]],
+                   chunk_rows: int) -> pd.DataFrame:
+    """Stream a sheet with openpyxl's read-only iterator, transposing blocks of rows into columns.
+
+    Cell values come out already typed, so unlike ``pd.read_excel`` no text
+    parser runs over them; only one block of rows is held as Python objects.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(_as_source(source), read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        names = _header_names(next(rows, ()))
+        wanted = names if columns is None else list(columns)
+        positions = [names.index(column) for column in wanted]
+
+        blocks = []
+        block = []
+        for row in rows:
+            if any(value is not None for value in row):
+                block.append(row)
+            if len(block) >= chunk_rows:
+                blocks.append(_block_frame(block, wanted, positions))
+                block = []
+        if block or not blocks:
+            blocks.append(_block_frame(block, wanted, positions))
+    finally:
+        workbook.close()
+    return pd.concat(blocks, ignore_index=True) if len(blocks) > 1 else blocks[0]
+
+
+def _block_frame(rows: list, names: List[str], positions: List[int]) -> pd.DataFrame:
+    columns = list(zip_longest(*rows)) if rows else []
+    return pd.DataFrame({
+        name: pd.Series(columns[position] if position < len(columns) else [None] * len(rows))
+        for name, position in zip(names, positions)
+    })
+
+
+def read_sheet(source, sheet_name: SheetRef = 0, columns: Optional[List[str]] = None,
+               chunk_rows: Optional[int] = None) -> pd.DataFrame:
+    """Read one sheet (optionally only ``columns``) of a workbook with the fastest available engine."""
+    if chunk_rows is None:
+        chunk_rows = DATASET_SETTINGS["excel_chunk_rows"]
+    if excel_engine() == "calamine":
+        return pd.read_excel(_as_source(source), sheet_name=sheet_name, engine="calamine", usecols=columns)
+    return _read_openpyxl(source, sheet_name, columns, chunk_rows)
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from config import EXPORT_DIR, EXPORT_SETTINGS
+from instrumentation import timed
+
+# Download formats: (file extension, MIME type)
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("csv", "text/csv"),
+    "excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("parquet", "application/vnd.apache.parquet")
+}
+
+_lock = threading.Lock()
+
+
+def _chunks(df: pd.DataFrame, chunk_rows: int):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df: pd.DataFrame, path: Path, chunk_rows: int) -> None:
+    """Write a CSV chunk by chunk so only one chunk is ever formatted in memory."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        df.iloc[:0].to_csv(f, index=False)
+        for chunk in _chunks(df, chunk_rows):
+            chunk.to_csv(f, index=False, header=False)
+
+
+def write_xlsx(df: pd.DataFrame, path: Path, chunk_rows: int) -> None:
+    """Write an Excel workbook with openpyxl's write-only (streaming) worksheet."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append([str(column) for column in df.columns])
+    for chunk in _chunks(df, chunk_rows):
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(path)
+
+
+def write_parquet(df: pd.DataFrame, path: Path, chunk_rows: int) -> None:
+    """Write a Parquet file one row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+WRITERS = {"csv": write_csv, "excel": write_xlsx, "parquet": write_parquet}
+
+
+def export_key(dataset_key: str, filter_state: str, file_type: str) -> str:
+    """Return the cache key of an export of a filtered dataset."""
+    payload = f"{dataset_key}|{filter_state}|{file_type}".encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _prune(keep: Path) -> None:
+    """Delete the least recently used exports beyond the disk budget."""
+    files = sorted(EXPORT_DIR.glob("*.*"), key=lambda p: p.stat().st_atime, reverse=True)
+    total = 0
+    for path in files:
+        total += path.stat().st_size
+        if total > EXPORT_SETTINGS["cache_max_bytes"] and path != keep:
+            path.unlink(missing_ok=True)
+
+
+def export_file(df: pd.DataFrame, file_type: str, dataset_key: str, filter_state: str) -> Path:
+    """Return the path of the export of ``df``, writing it only on the first request.
+
+    Exports are cached on disk by (dataset key, filter state, format).
+    """
+    if file_type not in FORMATS:
+        raise ValueError("Unsupported file type")
+    extension, _ = FORMATS[file_type]
+    path = EXPORT_DIR / f"{export_key(dataset_key, filter_state, file_type)}.{extension}"
+
+    with _lock:
+        if path.exists():
+            os.utime(path)
+            return path
+        tmp_path = path.with_name(f"{path.stem}.tmp.{extension}")
+        WRITERS[file_type](df, tmp_path, EXPORT_SETTINGS["chunk_rows"])
+        os.replace(tmp_path, path)
+        _prune(path)
+    return path
+
+
+@timed("export")
+def read_export(df: pd.DataFrame, file_type: str, dataset_key: str, filter_state: str) -> bytes:
+    """Return the contents of the export, for deferred download buttons."""
+    return export_file(df, file_type, dataset_key, filter_state).read_bytes()
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from config import CACHE_SETTINGS
+from instrumentation import stage
+
+
+def figure_key(*parts: Any) -> str:
+    """Return a stable digest of a (dataset, filter state, chart spec) combination."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class FigureCache:
+    """LRU cache of serialized Plotly figures bounded by their JSON size.
+
+    Unchanged charts are restored from their cached JSON instead of being
+    rebuilt through plotly express on every rerun.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached figure JSON for ``key`` or None."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: str, payload: str) -> None:
+        """Store figure JSON, evicting least recently used entries over budget."""
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key))
+            if len(payload) > self.max_bytes:
+                return
+            self._entries[key] = payload
+            self.current_bytes += len(payload)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def lookup_or_build(self, key: str, build: Callable[[], go.Figure]) -> Tuple[go.Figure, bool]:
+        """Return the figure for ``key`` and whether it was a cache hit."""
+        payload = self.get(key)
+        if payload is None:
+            fig = build()
+            with stage("serialize_figure"):
+                payload = fig.to_json()
+            self.put(key, payload)
+            return fig, False
+        with stage("deserialize_figure"):
+            return pio.from_json(payload, skip_invalid=True), True
+
+    def get_or_build(self, key: str, build: Callable[[], go.Figure]) -> go.Figure:
+        """Return the figure for ``key``, calling ``build`` only on a miss."""
+        return self.lookup_or_build(key, build)[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage of the cache."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+_figure_cache = FigureCache(CACHE_SETTINGS["figure_cache_max_bytes"])
+
+
+def get_figure_cache() -> FigureCache:
+    """Return the process-wide figure cache."""
+    return _figure_cache
+
+
+def cached_figure(build: Callable[[], go.Figure], *key_parts: Any) -> go.Figure:
+    """Return a figure from the process-wide cache, building it on a miss."""
+    return get_figure_cache().get_or_build(figure_key(*key_parts), build)
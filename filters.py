@@ -0,0 +1,203 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import FILTER_SETTINGS
+
+
+def is_range(value: Any) -> bool:
+    """Return True for range predicates of the form {'min': a, 'max': b}."""
+    return isinstance(value, dict) and ('min' in value or 'max' in value)
+
+
+def is_active(value: Any) -> bool:
+    """Return False for filter values that mean 'no filter' in the sidebar."""
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value != ''
+    return True
+
+
+def _categorical_isin(series: pd.Series, values) -> Optional[np.ndarray]:
+    codes = series.cat.codes.to_numpy()
+    selected = series.cat.categories.get_indexer(pd.Index(values).dropna().unique())
+    # One extra slot so that the -1 code of missing values looks up False
+    lookup = np.zeros(len(series.cat.categories) + 1, dtype=bool)
+    lookup[selected[selected >= 0]] = True
+    if lookup[:-1].all() and not (codes < 0).any():
+        return None
+    return lookup[codes]
+
+
+def _range_mask(series: pd.Series, value: Dict[str, Any]) -> Optional[np.ndarray]:
+    low, high = value.get('min'), value.get('max')
+    if low is None and high is None:
+        return None
+    values = series.to_numpy()
+    mask = np.ones(len(values), dtype=bool) if low is None else values >= low
+    if high is not None:
+        mask &= values <= high
+    return np.asarray(mask, dtype=bool)
+
+
+def column_mask(series: pd.Series, value: Any) -> Optional[np.ndarray]:
+    """Return the boolean mask of one predicate, or None if it keeps every row.
+
+    Lists and tuples select the listed values, dicts with 'min'/'max' select
+    an inclusive numeric range and any other value is an equality test.
+    """
+    is_categorical = isinstance(series.dtype, pd.CategoricalDtype)
+    if is_range(value):
+        return _range_mask(series, value)
+    if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+        if is_categorical:
+            return _categorical_isin(series, list(value))
+        return series.isin(value).to_numpy()
+    if is_categorical:
+        return _categorical_isin(series, [value])
+    return (series == value).to_numpy(dtype=bool, na_value=False)
+
+
+def build_mask(df: pd.DataFrame, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+    """AND all active predicates into a single mask; None if nothing filters."""
+    mask = None
+    for column, value in filters.items():
+        if not is_active(value):
+            continue
+        predicate = column_mask(df[column], value)
+        if predicate is None:
+            continue
+        if mask is None:
+            mask = predicate.copy()
+        else:
+            mask &= predicate
+    return mask
+
+
+def predicate_key(value: Any) -> Hashable:
+    """Return an order-insensitive hashable key for a filter value."""
+    if is_range(value):
+        return ('range', value.get('min'), value.get('max'))
+    if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+        return ('in', frozenset(value))
+    return ('eq', value)
+
+
+def filter_state_key(filters: Dict[str, Any]) -> str:
+    """Return a canonical string of the active filters, for use in cache keys."""
+    state = sorted(
+        (str(column), repr(predicate_key(value)) if not isinstance(value, (list, tuple, set, np.ndarray, pd.Index))
+         else repr(sorted(map(repr, value))))
+        for column, value in filters.items() if is_active(value)
+    )
+    return repr(state)
+
+
+class MaskCache:
+    """LRU cache of per-column predicate masks keyed by dataset and predicate.
+
+    Predicates that keep every row are cached as None, so they cost nothing
+    to store. Entries of a dataset are dropped with ``invalidate``.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, Hashable], Optional[np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def column_mask(self, df: pd.DataFrame, dataset_key: str, column: str, value: Any,
+                    value_index: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+        """Return the cached mask of one predicate, computing it on a miss.
+
+        Misses on list predicates over a column of ``value_index`` are answered
+        from the index's row positions instead of scanning the column.
+        """
+        key = (dataset_key, column, predicate_key(value))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        if value_index is not None and column in value_index and isinstance(value, (list, tuple, set)):
+            mask = value_index[column].isin_mask(value)
+        else:
+            mask = column_mask(df[column], value)
+        size = 0 if mask is None else mask.nbytes
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = mask
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.current_bytes -= 0 if evicted is None else evicted.nbytes
+        return mask
+
+    def invalidate(self, dataset_key: Optional[str] = None) -> None:
+        """Drop the masks of one dataset, or of every dataset if no key is given."""
+        with self._lock:
+            for key in [key for key in self._entries if dataset_key is None or key[0] == dataset_key]:
+                mask = self._entries.pop(key)
+                self.current_bytes -= 0 if mask is None else mask.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage of the cache."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+_mask_cache = MaskCache(FILTER_SETTINGS["mask_cache_max_bytes"])
+
+
+def get_mask_cache() -> MaskCache:
+    """Return the process-wide filter mask cache."""
+    return _mask_cache
+
+
+def build_mask_cached(df: pd.DataFrame, filters: Dict[str, Any], dataset_key: str,
+                      value_index: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+    """Like ``build_mask`` but reuses cached per-column masks of ``dataset_key``."""
+    cache = get_mask_cache()
+    mask = None
+    for column, value in filters.items():
+        if not is_active(value):
+            continue
+        predicate = cache.column_mask(df, dataset_key, column, value, value_index)
+        if predicate is None:
+            continue
+        if mask is None:
+            mask = predicate.copy()
+        else:
+            mask &= predicate
+    return mask
+
+
+def filter_frame(df: pd.DataFrame, filters: Dict[str, Any], dataset_key: Optional[str] = None,
+                 value_index: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """Return the rows matching every filter, materializing the result once.
+
+    When ``dataset_key`` identifies the contents of ``df``, per-column masks
+    are served from the mask cache so only changed predicates are evaluated,
+    using the dataset's ``value_index`` when one is given.
+    """
+    if dataset_key is None:
+        mask = build_mask(df, filters)
+    else:
+        mask = build_mask_cached(df, filters, dataset_key, value_index)
+    if mask is None:
+        return df.copy(deep=False)
+    return df[mask]
@@ -0,0 +1,169 @@
+import io
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from cleaning import CleaningPlan, RowDeduplicator, profile_cleaning
+from config import UPLOAD_SETTINGS
+from correlation import CorrelationStats
+from dtypes import is_categorical_column
+from loader import infer_schema
+
+
+class StreamingStats:
+    """Overview statistics accumulated chunk by chunk.
+
+    Tracks row counts, null counts, per-column min/max/mean, category
+    counts and the correlation statistics of the numeric columns without
+    ever holding more than one chunk in memory. Columns with more than
+    ``max_categories`` distinct values stop tracking counts.
+    """
+
+    def __init__(self, max_categories: int = 1000):
+        self.max_categories = max_categories
+        self.rows = 0
+        self.columns = []
+        self.null_counts = None
+        self._min = {}
+        self._max = {}
+        self._sum = {}
+        self._count = {}
+        self._category_counts: Dict[str, Optional[pd.Series]] = {}
+        self._correlation: Optional[CorrelationStats] = None
+
+    def update(self, raw_chunk: pd.DataFrame, chunk: Optional[pd.DataFrame] = None) -> None:
+        """Fold one chunk into the statistics.
+
+        Null counts are taken from ``raw_chunk`` (before cleaning), everything
+        else from ``chunk`` when a cleaned chunk is given.
+        """
+        if chunk is None:
+            chunk = raw_chunk
+        if not self.columns:
+            self.columns = list(raw_chunk.columns)
+            self.null_counts = pd.Series(0, index=self.columns, dtype='int64')
+
+        self.null_counts = self.null_counts.add(raw_chunk.isna().sum(), fill_value=0).astype('int64')
+        self.rows += len(chunk)
+        if self._correlation is None:
+            self._correlation = CorrelationStats(list(chunk.select_dtypes(include=[np.number]).columns))
+        self._correlation.update_frame(chunk)
+
+        for column in chunk.columns:
+            series = chunk[column]
+            if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                values = series.to_numpy(dtype='float64', na_value=np.nan)
+                valid = values[~np.isnan(values)]
+                if not len(valid):
+                    continue
+                self._min[column] = min(self._min.get(column, np.inf), valid.min())
+                self._max[column] = max(self._max.get(column, -np.inf), valid.max())
+                self._sum[column] = self._sum.get(column, 0.0) + valid.sum()
+                self._count[column] = self._count.get(column, 0) + len(valid)
+            elif is_categorical_column(series):
+                counts = self._category_counts.get(column, pd.Series(dtype='int64'))
+                if counts is None:
+                    continue
+                chunk_counts = series.value_counts(dropna=True)
+                counts = counts.add(chunk_counts[chunk_counts > 0], fill_value=0).astype('int64')
+                self._category_counts[column] = counts if len(counts) <= self.max_categories else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the accumulated overview statistics."""
+        numeric = pd.DataFrame({
+            'min': pd.Series(self._min),
+            'max': pd.Series(self._max),
+            'mean': pd.Series(self._sum) / pd.Series(self._count),
+            'count': pd.Series(self._count)
+        })
+        return {
+            'shape': (self.rows, len(self.columns)),
+            'columns': self.columns,
+            'null_counts': self.null_counts,
+            'numeric': numeric,
+            'category_counts': {
+                column: counts.sort_values(ascending=False)
+                for column, counts in self._category_counts.items() if counts is not None
+            },
+            'high_cardinality_columns': [
+                column for column, counts in self._category_counts.items() if counts is None
+            ],
+            'correlation': self._correlation.corr() if self._correlation is not None else None
+        }
+
+
+def stream_csv(source, total_bytes: Optional[int] = None, chunk_rows: Optional[int] = None,
+               clean: bool = True, on_progress: Optional[Callable[[float], None]] = None,
+               plan: Optional[CleaningPlan] = None) -> Dict[str, Any]:
+    """Read a CSV in chunks and return its overview statistics.
+
+    Each chunk is parsed with the categoricals inferred from the first rows
+    (or without a schema if later values break the typed parse) and cleaned
+    with ``plan`` (by default profiled from the first chunk) before being
+    folded into the statistics. Duplicates are dropped across chunks.
+    ``on_progress`` receives the fraction of ``total_bytes`` consumed so far.
+    """
+    if chunk_rows is None:
+        chunk_rows = UPLOAD_SETTINGS["chunk_rows"]
+    if isinstance(source, (bytes, bytearray)):
+        total_bytes = total_bytes or len(source)
+        source = io.BytesIO(source)
+
+    schema = infer_schema(pd.read_csv(source, nrows=min(chunk_rows, 10000)))
+    source.seek(0)
+
+    try:
+        stats = _fold_chunks(source, schema, chunk_rows, clean, plan, total_bytes, on_progress)
+    except (ValueError, TypeError):
+        if not schema:
+            raise
+        # Start over untyped; statistics of chunks already folded would be counted twice
+        source.seek(0)
+        stats = _fold_chunks(source, None, chunk_rows, clean, plan, total_bytes, on_progress)
+
+    if on_progress is not None:
+        on_progress(1.0)
+    return stats.summary()
+
+
+def _fold_chunks(source, schema: Optional[Dict[str, str]], chunk_rows: int, clean: bool,
+                 plan: Optional[CleaningPlan], total_bytes: Optional[int],
+                 on_progress: Optional[Callable[[float], None]]) -> StreamingStats:
+    stats = StreamingStats()
+    deduplicator = RowDeduplicator()
+    for raw_chunk in pd.read_csv(source, dtype=schema, chunksize=chunk_rows):
+        if not clean:
+            stats.update(raw_chunk)
+        else:
+            if plan is None:
+                plan = profile_cleaning(raw_chunk)
+            stats.update(raw_chunk, plan.apply(raw_chunk, deduplicator))
+        if on_progress is not None and total_bytes:
+            on_progress(min(source.tell() / total_bytes, 1.0))
+    return stats
+
+
+_summary_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_summary_lock = threading.Lock()
+
+
+def stream_uploaded_csv(uploaded_file, key: str,
+                        on_progress: Optional[Callable[[float], None]] = None) -> Dict[str, Any]:
+    """Return the streamed overview of an upload, reusing it across reruns."""
+    with _summary_lock:
+        if key in _summary_cache:
+            _summary_cache.move_to_end(key)
+            return _summary_cache[key]
+
+    uploaded_file.seek(0)
+    summary = stream_csv(uploaded_file, total_bytes=uploaded_file.size, on_progress=on_progress)
+    uploaded_file.seek(0)
+
+    with _summary_lock:
+        _summary_cache[key] = summary
+        while len(_summary_cache) > UPLOAD_SETTINGS["summary_cache_entries"]:
+            _summary_cache.popitem(last=False)
+    return summary
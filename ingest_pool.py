@@ -0,0 +1,115 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from config import INGEST_SETTINGS
+from instrumentation import timed
+from loader import load_file
+from store import upload_store
+
+
+def snapshot_key(content_key: str, sheet_name: Union[int, str] = 0) -> str:
+    """Return the upload store key of a file (or of one sheet of a workbook)."""
+    if sheet_name == 0:
+        return content_key
+    digest = hashlib.blake2b(str(sheet_name).encode(), digest_size=4).hexdigest()
+    return f"{content_key}-sheet-{digest}"
+
+
+class UploadJob:
+    """One upload (or one sheet of an uploaded workbook) to parse into a snapshot."""
+
+    def __init__(self, data: bytes, filename: str, content_key: str, sheet_name: Union[int, str] = 0):
+        self.data = data
+        self.filename = filename
+        self.content_key = content_key
+        self.sheet_name = sheet_name
+        self.key = snapshot_key(content_key, sheet_name)
+
+
+def parse_to_snapshot(path: str, filename: str, key: str, sheet_name: Union[int, str] = 0) -> Dict[str, Any]:
+    """Parse a file and write it to the upload store; returns the snapshot manifest.
+
+    Runs in the worker processes: only the file path goes in and only the
+    small manifest comes back, the frame itself travels through the Arrow
+    snapshot the parent memory-maps.
+    """
+    parsed, report = load_file(Path(path), filename, sheet_name=sheet_name)
+    return upload_store.write(key, parsed, source_name=filename,
+                              metadata={'raw_bytes': report['raw_bytes'], 'sheet_name': sheet_name})
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_ingest_pool() -> ProcessPoolExecutor:
+    """Return the process-wide ingestion pool, starting it on first use.
+
+    Workers are spawned rather than forked, since the Streamlit server
+    process runs many threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=INGEST_SETTINGS["max_workers"],
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+@timed("parse_uploads")
+def snapshot_uploads(jobs: List[UploadJob]) -> None:
+    """Parse the uploads missing from the upload store into snapshots.
+
+    Batches of several jobs above ``parallel_min_bytes`` are parsed on the
+    process pool, one job per worker, so parsing two large files takes
+    about as long as parsing the larger one. On a single CPU everything is
+    parsed in the calling thread.
+    """
+    jobs = [job for job in jobs if not upload_store.has(job.key)]
+    if not jobs:
+        return
+
+    total_bytes = sum(len(job.data) for job in {job.content_key: job for job in jobs}.values())
+    if (len(jobs) == 1 or total_bytes < INGEST_SETTINGS["parallel_min_bytes"]
+            or min(INGEST_SETTINGS["max_workers"], os.cpu_count() or 1) < 2):
+        for job in jobs:
+            parsed, report = load_file(job.data, job.filename, sheet_name=job.sheet_name)
+            upload_store.write(job.key, parsed, source_name=job.filename,
+                               metadata={'raw_bytes': report['raw_bytes'], 'sheet_name': job.sheet_name})
+        return
+
+    # Stage each distinct upload once so workers receive a path instead of pickled bytes;
+    # the names are unique per call, since sessions may parse the same upload concurrently
+    staged = {}
+    for job in jobs:
+        if job.content_key not in staged:
+            path = upload_store.root / f"{job.content_key}.{uuid.uuid4().hex}.incoming{Path(job.filename).suffix}"
+            path.write_bytes(job.data)
+            staged[job.content_key] = path
+    try:
+        pool = get_ingest_pool()
+        futures = [
+            pool.submit(parse_to_snapshot, str(staged[job.content_key]), job.filename, job.key, job.sheet_name)
+            for job in jobs
+        ]
+        for future in futures:
+            future.result()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+    finally:
+        for path in staged.values():
+            path.unlink(missing_ok=True)
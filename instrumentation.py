@@ -0,0 +1,229 @@
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config import LOGGING_SETTINGS
+
+# Page being rendered, attached to every stage recorded while it runs
+_page: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("page", default=None)
+
+
+def _row_count(value: Any) -> Optional[int]:
+    """Return the number of rows of a frame-like value, None for anything else."""
+    shape = getattr(value, "shape", None)
+    if isinstance(shape, tuple) and shape:
+        return int(shape[0])
+    return None
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class StageRecorder:
+    """Keeps recent durations per (stage, page) and writes every record to the JSON log.
+
+    The log is a rotating file configured from ``LOGGING_SETTINGS``, with one
+    JSON object per line. Only the last ``window`` samples of each stage
+    and page are kept in memory for the latency percentiles.
+    """
+
+    def __init__(self, enabled: bool, window: int):
+        self.enabled = enabled
+        self.window = window
+        self._samples: Dict[Tuple[str, Optional[str]], Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._logger: Optional[logging.Logger] = None
+
+    def _get_logger(self) -> logging.Logger:
+        if self._logger is None:
+            logger = logging.getLogger("kuber.performance")
+            with self._lock:
+                if not logger.handlers:
+                    handler = RotatingFileHandler(
+                        LOGGING_SETTINGS["log_file"],
+                        maxBytes=LOGGING_SETTINGS["max_file_size"],
+                        backupCount=LOGGING_SETTINGS["backup_count"],
+                        encoding="utf-8"
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger.addHandler(handler)
+                    logger.setLevel(LOGGING_SETTINGS["log_level"])
+                    logger.propagate = False
+                self._logger = logger
+        return self._logger
+
+    def record(self, stage: str, seconds: float, page: Optional[str] = None, **fields: Any) -> None:
+        """Add a duration sample and log it with any extra fields (row counts, errors)."""
+        with self._lock:
+            samples = self._samples.get((stage, page))
+            if samples is None:
+                samples = self._samples[(stage, page)] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+        logger = self._get_logger()
+        if logger.isEnabledFor(logging.INFO):
+            entry = {
+                "time": datetime.now().isoformat(timespec="milliseconds"),
+                "stage": stage,
+                "page": page,
+                "ms": round(seconds * 1000, 3),
+                "thread": threading.current_thread().name
+            }
+            entry.update({name: value for name, value in fields.items() if value is not None})
+            logger.info(json.dumps(entry, default=str))
+
+    def summary(self, by: str = "stage") -> List[Dict[str, Any]]:
+        """Return count, p50 and p95 in milliseconds per stage (across pages) or per page.
+
+        ``by="page"`` summarizes the whole-page renders recorded by ``page_timer``.
+        """
+        groups: Dict[str, List[float]] = {}
+        with self._lock:
+            for (stage, page), samples in self._samples.items():
+                if by == "page":
+                    if stage != "page":
+                        continue
+                    name = page
+                else:
+                    name = stage
+                groups.setdefault(name, []).extend(samples)
+
+        rows = []
+        for name, samples in groups.items():
+            ordered = sorted(samples)
+            rows.append({
+                by: name,
+                "count": len(ordered),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 1)
+            })
+        return sorted(rows, key=lambda row: -row["p95_ms"])
+
+    def clear(self) -> None:
+        """Forget every latency sample."""
+        with self._lock:
+            self._samples.clear()
+
+
+_recorder = StageRecorder(LOGGING_SETTINGS["instrumentation_enabled"], LOGGING_SETTINGS["latency_window"])
+
+
+def get_stage_recorder() -> StageRecorder:
+    """Return the process-wide stage recorder."""
+    return _recorder
+
+
+class _Stage:
+    """Times the block it wraps; set ``rows`` inside the block to log a row count."""
+
+    def __init__(self, name: str, fields: Dict[str, Any]):
+        self.name = name
+        self.fields = fields
+        self.rows = None
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _recorder.record(self.name, time.perf_counter() - self.start, _page.get(), rows=self.rows,
+                         error=exc_type.__name__ if exc_type is not None else None, **self.fields)
+        return False
+
+
+class _PageStage(_Stage):
+    """A stage that also attributes every stage recorded inside it to the page."""
+
+    def __init__(self, page: str):
+        super().__init__("page", {})
+        self.page = page
+
+    def __enter__(self) -> "_PageStage":
+        self.token = _page.set(self.page)
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            return super().__exit__(exc_type, exc, tb)
+        finally:
+            _page.reset(self.token)
+
+
+class _DisabledStage:
+    """Stands in for a stage while instrumentation is off; accepts and ignores ``rows``."""
+
+    rows = None
+
+    def __enter__(self) -> "_DisabledStage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+
+_DISABLED = _DisabledStage()
+
+
+def stage(name: str, **fields: Any):
+    """Return a context manager timing a block as stage ``name`` (a no-op while disabled)."""
+    if not _recorder.enabled:
+        return _DISABLED
+    return _Stage(name, fields)
+
+
+def page_timer(page: str):
+    """Return a context manager timing the render of ``page`` and tagging the stages inside it."""
+    if not _recorder.enabled:
+        return _DISABLED
+    return _PageStage(page)
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorate a function to record its duration as a stage (named after it by default).
+
+    The row counts of a frame passed as first argument and of a returned
+    frame are logged as ``rows_in`` and ``rows``. While instrumentation is
+    disabled the call goes straight through.
+    """
+    def decorate(func: Callable) -> Callable:
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _recorder.enabled:
+                return func(*args, **kwargs)
+            rows_in = _row_count(args[0]) if args else None
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _recorder.record(stage_name, time.perf_counter() - start, _page.get(),
+                                 rows_in=rows_in, error=type(e).__name__)
+                raise
+            _recorder.record(stage_name, time.perf_counter() - start, _page.get(),
+                             rows_in=rows_in, rows=_row_count(result))
+            return result
+        return wrapper
+    return decorate
+
+
+def set_enabled(enabled: bool) -> None:
+    """Turn stage recording on or off for the whole process."""
+    _recorder.enabled = enabled
+
+
+def latency_summary(by: str = "stage") -> List[Dict[str, Any]]:
+    """Return p50/p95 latencies per stage or per page (see ``StageRecorder.summary``)."""
+    return _recorder.summary(by)
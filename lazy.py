@@ -0,0 +1,50 @@
+import importlib.util
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict
+
+_import_times: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+class _TimedLoader:
+    """Wraps a module loader to record how long executing the module takes."""
+
+    def __init__(self, loader, name: str):
+        self.loader = loader
+        self.name = name
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        start = time.perf_counter()
+        self.loader.exec_module(module)
+        _import_times[self.name] = time.perf_counter() - start
+
+
+def lazy_module(name: str) -> ModuleType:
+    """Return ``name`` as a module that is only imported when an attribute is first used.
+
+    Already imported modules are returned as they are. The time the
+    deferred import takes is recorded in ``import_times()``.
+    """
+    with _lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+        loader = importlib.util.LazyLoader(_TimedLoader(spec.loader, name))
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
+
+
+def import_times() -> Dict[str, float]:
+    """Return the seconds each lazily imported module took to load on first use."""
+    return dict(_import_times)
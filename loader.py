@@ -0,0 +1,120 @@
+import io
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+from config import DATASET_SETTINGS
+from dtypes import is_categorical_column, narrow_float, optimize_dtypes
+from excel import read_sheet
+
+Source = Union[str, Path, bytes, io.IOBase]
+
+
+def _rewindable(source: Source):
+    """Return a source that can be read more than once."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+def _rewind(source) -> None:
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def infer_schema(sample: pd.DataFrame, category_max_ratio: Optional[float] = None) -> Dict[str, str]:
+    """Infer categorical parse dtypes from a sample of rows.
+
+    Text columns whose distinct values make up at most ``category_max_ratio``
+    of the sample become categoricals. Numeric columns are left to the
+    post-parse downcast, since values outside the sample could overflow or
+    lose precision in a narrower parse dtype.
+    """
+    if category_max_ratio is None:
+        category_max_ratio = DATASET_SETTINGS["category_max_ratio"]
+
+    schema = {}
+    for column in sample.columns:
+        series = sample[column]
+        if is_categorical_column(series):
+            if len(series) and series.nunique(dropna=True) <= category_max_ratio * len(series):
+                schema[column] = 'category'
+    return schema
+
+
+def _downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    result = None
+    for position in range(len(df.columns)):
+        series = df.iloc[:, position]
+        if pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            downcast = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+            converted = pd.to_numeric(series, downcast=downcast)
+        elif pd.api.types.is_float_dtype(series.dtype):
+            converted = narrow_float(series)
+        else:
+            continue
+        if converted is not series:
+            if result is None:
+                result = df.copy()
+            result.isetitem(position, converted)
+    return df if result is None else result
+
+
+def read_csv_compact(source: Source, engine: Optional[str] = None,
+                     sample_rows: Optional[int] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Parse a CSV with an inferred compact schema.
+
+    A sampling pass infers the categorical columns, then the full file is
+    parsed with them; if values outside the sample break the typed parse,
+    the file is parsed again without a schema. Numbers are parsed at full
+    width and narrowed afterwards. Returns the frame and a memory report
+    with the estimated footprint of a plain ``pd.read_csv`` parse next to
+    the actual compact footprint.
+    """
+    if engine is None:
+        engine = DATASET_SETTINGS["csv_engine"]
+    if sample_rows is None:
+        sample_rows = DATASET_SETTINGS["schema_sample_rows"]
+
+    source = _rewindable(source)
+    sample = pd.read_csv(source, nrows=sample_rows)
+    _rewind(source)
+    schema = infer_schema(sample)
+
+    try:
+        df = pd.read_csv(source, dtype=schema, engine=engine)
+    except (ValueError, TypeError):
+        _rewind(source)
+        df = pd.read_csv(source, engine=engine)
+    df = _downcast_numeric(df)
+
+    sample_bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+    return df, memory_report(sample_bytes_per_row * len(df), df)
+
+
+def read_excel_compact(source: Source, sheet_name: Union[int, str] = 0) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Parse one sheet of an Excel workbook and compact its dtypes after parsing."""
+    raw = read_sheet(_rewindable(source), sheet_name)
+    raw_bytes = raw.memory_usage(deep=True).sum()
+    df = optimize_dtypes(raw)
+    return df, memory_report(raw_bytes, df)
+
+
+def memory_report(raw_bytes: float, df: pd.DataFrame) -> Dict[str, Any]:
+    """Return the before/after memory numbers of a compacted frame."""
+    compact_bytes = int(df.memory_usage(deep=True).sum())
+    return {
+        'rows': len(df),
+        'raw_bytes': int(raw_bytes),
+        'compact_bytes': compact_bytes,
+        'reduction': float(raw_bytes / compact_bytes) if compact_bytes else 1.0
+    }
+
+
+def load_file(source: Source, filename: str,
+              sheet_name: Union[int, str] = 0) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Load a CSV or Excel source (``sheet_name`` of a workbook) with compact dtypes based on its file name."""
+    if str(filename).lower().endswith('.csv'):
+        return read_csv_compact(source)
+    return read_excel_compact(source, sheet_name)
@@ -0,0 +1,138 @@
+import threading
+import uuid
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from store import DatasetStore, source_key, static_store
+
+
+class PooledDataset:
+    """One version of a source file: its memory-mapped snapshot and the frame shared by all sessions."""
+
+    def __init__(self, key: str, table: pa.Table, size: int, mtime_ns: int):
+        self.key = key
+        self.table = table
+        self.frame = table.to_pandas(split_blocks=True)
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sessions: Set[str] = set()
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.frame.memory_usage(deep=True, index=True).sum())
+
+
+class DatasetPool:
+    """Process-wide, read-only datasets of local source files shared between sessions.
+
+    Every session gets a shallow copy of the same frame for a source
+    version instead of materializing its own data, so memory stays flat as
+    sessions are added.
+    When the source file changes on disk the next acquire loads the new
+    version; older versions are kept while a session still references them
+    and dropped when the last one releases it. Column assignments on a
+    returned frame stay local to it, and pandas 3 copy-on-write (required
+    in requirements.txt) copies shared column data before it is modified.
+    """
+
+    def __init__(self, store: DatasetStore = static_store):
+        self.store = store
+        self.loads = 0
+        self._current: Dict[Path, PooledDataset] = {}
+        self._stale: Dict[Path, list] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, path: Path, session_id: str) -> Tuple[pd.DataFrame, str]:
+        """Return a shallow copy of the shared frame of the current version of ``path`` and its key."""
+        path = Path(path).resolve()
+        stat = path.stat()
+        with self._lock:
+            entry = self._current.get(path)
+            if entry is None or (entry.size, entry.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                # Loading under the lock keeps concurrent sessions from materializing duplicates
+                key = source_key(path, self.store)
+                if entry is None or entry.key != key:
+                    new_entry = PooledDataset(key, self.store.read_table(key), stat.st_size, stat.st_mtime_ns)
+                    self.loads += 1
+                    if entry is not None:
+                        self._retire(path, entry)
+                    entry = self._current[path] = new_entry
+                else:
+                    entry.size, entry.mtime_ns = stat.st_size, stat.st_mtime_ns
+            for stale in self._stale.get(path, []):
+                stale.sessions.discard(session_id)
+            self._drop_unreferenced(path)
+            entry.sessions.add(session_id)
+            return entry.frame.copy(deep=False), entry.key
+
+    def table(self, path: Path) -> Tuple[pa.Table, str]:
+        """Return the memory-mapped Arrow table of the current version of ``path`` and its key."""
+        path = Path(path).resolve()
+        with self._lock:
+            entry = self._current.get(path)
+        if entry is None:
+            key = source_key(path, self.store)
+            return self.store.read_table(key), key
+        return entry.table, entry.key
+
+    def release(self, session_id: str) -> None:
+        """Drop every reference a session holds, freeing versions no session uses any more."""
+        with self._lock:
+            for entry in self._current.values():
+                entry.sessions.discard(session_id)
+            for stale in self._stale.values():
+                for entry in stale:
+                    entry.sessions.discard(session_id)
+            for path in list(self._stale):
+                self._drop_unreferenced(path)
+
+    def _retire(self, path: Path, entry: PooledDataset) -> None:
+        if entry.sessions:
+            self._stale.setdefault(path, []).append(entry)
+
+    def _drop_unreferenced(self, path: Path) -> None:
+        stale = [entry for entry in self._stale.get(path, []) if entry.sessions]
+        if stale:
+            self._stale[path] = stale
+        else:
+            self._stale.pop(path, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of pooled versions, sessions holding them and their memory usage."""
+        with self._lock:
+            entries = list(self._current.values()) + [entry for stale in self._stale.values() for entry in stale]
+            return {
+                'datasets': len(self._current),
+                'stale_versions': len(entries) - len(self._current),
+                'sessions': len(set().union(*(entry.sessions for entry in entries))) if entries else 0,
+                'loads': self.loads,
+                'current_bytes': sum(entry.nbytes for entry in entries)
+            }
+
+
+class PoolLease:
+    """A session's handle on the dataset pool.
+
+    Keep one per session (in ``st.session_state``): its references are
+    released when the lease is garbage collected with the session state.
+    """
+
+    def __init__(self, pool: DatasetPool):
+        self.pool = pool
+        self.session_id = uuid.uuid4().hex
+        weakref.finalize(self, pool.release, self.session_id)
+
+    def acquire(self, path: Path) -> Tuple[pd.DataFrame, str]:
+        return self.pool.acquire(path, self.session_id)
+
+
+_pool = DatasetPool()
+
+
+def get_dataset_pool() -> DatasetPool:
+    """Return the process-wide dataset pool."""
+    return _pool
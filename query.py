@@ -0,0 +1,96 @@
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, Optional, Set
+
+import pandas as pd
+import pyarrow as pa
+
+from config import QUERY_SETTINGS
+from instrumentation import timed
+
+class QueryResult:
+    """The rows a SQL query returned, with its timing and the rows it scanned."""
+
+    def __init__(self, key: str, frame: pd.DataFrame, seconds: float, rows_scanned: int, truncated: bool):
+        self.key = key
+        self.frame = frame
+        self.seconds = seconds
+        self.rows_scanned = rows_scanned
+        self.truncated = truncated
+
+    def summary_label(self) -> str:
+        label = (f"{len(self.frame):,} rows in {self.seconds * 1000:.0f} ms, "
+                 f"{self.rows_scanned:,} rows scanned")
+        if self.truncated:
+            label += f" (only the first {len(self.frame):,} rows were fetched)"
+        return label
+
+
+def query_key(sql: str, table_keys: Dict[str, str]) -> str:
+    """Return a key identifying the result of ``sql`` over the given dataset versions."""
+    payload = json.dumps([sql, sorted(table_keys.items())]).encode()
+    return f"query-{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
+
+
+def referenced_tables(sql: str, names: Iterable[str]) -> Set[str]:
+    """Return the table ``names`` that ``sql`` refers to (as identifiers, case-insensitively)."""
+    import duckdb
+
+    lookup = {name.lower(): name for name in names}
+    tokens = duckdb.tokenize(sql)
+    ends = [start for start, _ in tokens[1:]] + [len(sql)]
+    found = set()
+    for (start, kind), end in zip(tokens, ends):
+        if kind == duckdb.token_type.identifier:
+            name = sql[start:end].strip().strip('"').lower()
+            if name in lookup:
+                found.add(lookup[name])
+    return found
+
+
+@timed()
+def run_query(sql: str, tables: Dict[str, pa.Table], key: str, max_rows: Optional[int] = None,
+              batch_rows: Optional[int] = None) -> QueryResult:
+    """Run ``sql`` with DuckDB over Arrow ``tables`` registered under their names.
+
+    DuckDB scans the Arrow buffers in place, so memory-mapped snapshots are
+    queried without copying them. The connection cannot read or write
+    files. The result is fetched in record batches and stops after
+    ``max_rows`` rows. The rows scanned are the input rows of the tables
+    the query reads, before any filter.
+    """
+    import duckdb
+
+    if max_rows is None:
+        max_rows = QUERY_SETTINGS["max_result_rows"]
+    if batch_rows is None:
+        batch_rows = QUERY_SETTINGS["batch_rows"]
+
+    con = duckdb.connect()
+    try:
+        for name, table in tables.items():
+            con.register(name, table)
+        con.execute("SET enable_external_access = false")
+        con.execute("SET lock_configuration = true")
+
+        start = time.perf_counter()
+        reader = con.execute(sql).to_arrow_reader(batch_rows)
+        batches = []
+        rows = 0
+        truncated = False
+        for batch in reader:
+            if rows + len(batch) > max_rows:
+                batches.append(batch.slice(0, max_rows - rows))
+                truncated = True
+                break
+            batches.append(batch)
+            rows += len(batch)
+        result = pa.Table.from_batches(batches, schema=reader.schema)
+        seconds = time.perf_counter() - start
+        reader.close()
+    finally:
+        con.close()
+
+    rows_scanned = sum(tables[name].num_rows for name in referenced_tables(sql, tables))
+    return QueryResult(key, result.to_pandas(split_blocks=True), seconds, rows_scanned, truncated)
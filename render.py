@@ -0,0 +1,63 @@
+import contextvars
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator
+
+import plotly.graph_objects as go
+
+from config import RENDER_SETTINGS
+from figure_cache import figure_key, get_figure_cache
+
+
+class RenderResult:
+    """A built chart with how long it took and whether it came from the figure cache."""
+
+    def __init__(self, figure: go.Figure, seconds: float, cached: bool):
+        self.figure = figure
+        self.seconds = seconds
+        self.cached = cached
+
+    def timing_label(self) -> str:
+        """Return a short caption like 'Rendered in 42 ms (cached)'."""
+        label = f"Rendered in {self.seconds * 1000:.0f} ms"
+        return f"{label} (cached)" if self.cached else label
+
+
+class RenderScheduler:
+    """Prepares independent charts on a pool of worker threads.
+
+    Workers run the data preparation of every chart (aggregation,
+    correlation, downsampling) plus figure (de)serialization through the
+    figure cache; Streamlit elements are only created by the script thread,
+    which places each figure as soon as it completes. Most of the heavy
+    lifting happens in pandas/numpy, which release the GIL.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="render")
+
+    def _run(self, build: Callable[[], go.Figure], key: str) -> RenderResult:
+        start = time.perf_counter()
+        figure, cached = get_figure_cache().lookup_or_build(key, build)
+        return RenderResult(figure, time.perf_counter() - start, cached)
+
+    def submit(self, build: Callable[[], go.Figure], *key_parts: Any) -> "Future[RenderResult]":
+        """Schedule a chart; ``key_parts`` identify it in the figure cache."""
+        # Run in a copy of the caller's context so timings stay attributed to its page
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, self._run, build, figure_key(*key_parts))
+
+    @staticmethod
+    def completed(futures: Iterable["Future[RenderResult]"]) -> Iterator["Future[RenderResult]"]:
+        """Yield the scheduled charts in the order they finish."""
+        return as_completed(list(futures))
+
+
+# Worker threads are only started when the first chart is submitted
+_scheduler = RenderScheduler(RENDER_SETTINGS["max_workers"])
+
+
+def get_render_scheduler() -> RenderScheduler:
+    """Return the process-wide render scheduler."""
+    return _scheduler
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from config import DATASET_SETTINGS, STATIC_DATA_DIR, USER_DATA_DIR
+from dtypes import optimize_dtypes
+from instrumentation import stage
+from loader import load_file
+
+
+class DatasetStore:
+    """Columnar snapshots of parsed datasets stored as Arrow IPC files.
+
+    Each snapshot is written once per content hash together with a small
+    JSON manifest. Reads are memory-mapped and only touch the requested
+    columns, so re-opening a dataset does not re-parse the source file.
+    With ``max_bytes`` set, the least recently used snapshots beyond that
+    many bytes are deleted after every write.
+    """
+
+    def __init__(self, root: Path, max_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def snapshot_path(self, key: str) -> Path:
+        return self.root / f"{key}.arrow"
+
+    def manifest_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def has(self, key: str) -> bool:
+        """Return True if a complete snapshot exists for ``key``."""
+        return self.snapshot_path(key).exists() and self.manifest_path(key).exists()
+
+    def manifest(self, key: str) -> Dict[str, Any]:
+        """Return the metadata manifest of a snapshot."""
+        with open(self.manifest_path(key), encoding='utf-8') as f:
+            return json.load(f)
+
+    def write(self, key: str, df: pd.DataFrame, source_name: str = '',
+              metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Compact ``df`` and persist it as the snapshot for ``key``."""
+        df = optimize_dtypes(df)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        # Write to temporary files first so readers never see partial snapshots; concurrent
+        # writers of the same key each get their own temporary file and the last replace wins
+        snapshot_path = self.snapshot_path(key)
+        tmp_suffix = f".{uuid.uuid4().hex}.tmp"
+        tmp_path = snapshot_path.with_name(snapshot_path.name + tmp_suffix)
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, snapshot_path)
+
+        manifest = {
+            'key': key,
+            'source_name': source_name,
+            'format': 'arrow-ipc',
+            'rows': table.num_rows,
+            'columns': [{'name': name, 'dtype': str(dtype)} for name, dtype in df.dtypes.items()],
+            'memory_bytes': int(df.memory_usage(deep=True).sum()),
+            'snapshot_bytes': snapshot_path.stat().st_size,
+            'created_at': datetime.now().isoformat(timespec='seconds')
+        }
+        manifest.update(metadata or {})
+        tmp_manifest = self.manifest_path(key).with_name(self.manifest_path(key).name + tmp_suffix)
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_manifest, self.manifest_path(key))
+        self.prune(keep=key)
+        return manifest
+
+    def prune(self, keep: Optional[str] = None) -> None:
+        """Delete the least recently used snapshots beyond the disk budget, except ``keep``."""
+        if self.max_bytes is None:
+            return
+        snapshots = []
+        for path in self.root.glob("*.arrow"):
+            try:
+                snapshots.append((path.stat(), path))
+            except FileNotFoundError:
+                continue
+        snapshots.sort(key=lambda entry: entry[0].st_atime, reverse=True)
+        total = 0
+        for stat, path in snapshots:
+            total += stat.st_size
+            if total > self.max_bytes and path.stem != keep:
+                try:
+                    # Manifest first, so the snapshot no longer counts as complete
+                    self.manifest_path(path.stem).unlink(missing_ok=True)
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    # Still memory-mapped by a reader on Windows; retried on the next prune
+                    continue
+
+    def read_table(self, key: str, columns: Optional[List[str]] = None) -> pa.Table:
+        """Memory-map a snapshot and return the requested columns as an Arrow table."""
+        # The mapping stays alive for as long as the returned buffers reference it
+        path = self.snapshot_path(key)
+        source = pa.memory_map(str(path), 'r')
+        if self.max_bytes is not None:
+            # Mark the snapshot as recently used for pruning
+            os.utime(path)
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        return table
+
+    def read(self, key: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Return a snapshot as a dataframe, optionally projected to ``columns``."""
+        return self.read_table(key, columns).to_pandas(split_blocks=True)
+
+
+upload_store = DatasetStore(USER_DATA_DIR / "snapshots", DATASET_SETTINGS["upload_store_max_bytes"])
+static_store = DatasetStore(STATIC_DATA_DIR / "snapshots")
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_key(path: Path, store: DatasetStore = static_store) -> str:
+    """Return the content hash of a local source file, snapshotting it into the store if needed.
+
+    The source is only hashed and parsed again when its size or modification
+    time no longer match the recorded source index entry.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    index_path = store.root / f"source-{hashlib.blake2b(str(path).encode(), digest_size=8).hexdigest()}.json"
+
+    key = None
+    if index_path.exists():
+        with open(index_path, encoding='utf-8') as f:
+            entry = json.load(f)
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            key = entry['key']
+
+    if key is None or not store.has(key):
+        key = _file_digest(path)
+        if not store.has(key):
+            with stage("parse_source", source=path.name) as timing:
+                df, report = load_file(path, path.name)
+                timing.rows = len(df)
+            store.write(key, df, source_name=path.name, metadata={'raw_bytes': report['raw_bytes']})
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump({'path': str(path), 'size': stat.st_size,
+                       'mtime_ns': stat.st_mtime_ns, 'key': key}, f)
+    return key
+
+
+def load_source(path: Path, columns: Optional[List[str]] = None,
+                store: DatasetStore = static_store) -> Tuple[pd.DataFrame, str]:
+    """Return a local source file and its content hash, served from the store."""
+    key = source_key(path, store)
+    return store.read(key, columns), key
@@ -0,0 +1,20 @@
+"""Import-time budget of the login screen (see benchmarks/bench_startup.py)."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from bench_startup import HEAVY_MODULES, LOGIN_BUDGET, app_imports, profile  # noqa: E402
+
+
+def test_login_imports_within_budget():
+    top_level, _ = app_imports()
+    seconds, _ = profile(top_level, repeat=3)
+    assert seconds <= LOGIN_BUDGET, f"login imports took {seconds:.3f}s (budget {LOGIN_BUDGET:.2f}s)"
+
+
+def test_login_skips_heavy_libraries():
+    top_level, _ = app_imports()
+    _, timings = profile(top_level, repeat=1)
+    imported = [module for module in HEAVY_MODULES if module in timings]
+    assert not imported, f"login imports {imported}; import them on first use instead"
@@ -2,28 +2,35 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import seaborn as sns
-import matplotlib.pyplot as plt
 from typing import List, Tuple, Dict, Any
 import io
 import base64
+from cleaning import clean_frame
+from dtypes import is_categorical_column, optimize_dtypes
+from filters import filter_frame
+from aggregation import aggregate_by_category
+from downsample import downsample_line, downsample_scatter, render_mode
+from correlation import correlation_matrix
+from diff import diff_datasets
+from instrumentation import timed
 
+@timed()
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean and preprocess the input dataframe."""
-    # Remove duplicates
-    df = df.drop_duplicates()
-    
-    # Handle missing values
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
-    
-    categorical_cols = df.select_dtypes(include=['object']).columns
-    df[categorical_cols] = df[categorical_cols].fillna('Unknown')
-    
-    return df
+    """Clean and preprocess the input dataframe.
+
+    Unifies differently spelled values, drops duplicate rows and fills
+    missing values (numeric means, 'Unknown' for text) through a cleaning
+    plan profiled from the dataframe; see ``cleaning.CleaningPlan``.
+    """
+    return clean_frame(df)[0]
 
-def compare_datasets(df1: pd.DataFrame, df2: pd.DataFrame) -> Dict[str, Any]:
-    """Compare two datasets and return comparison metrics."""
+@timed()
+def compare_datasets(df1: pd.DataFrame, df2: pd.DataFrame, key_columns: List[str] = None) -> Dict[str, Any]:
+    """Compare two datasets and return comparison metrics.
+
+    Rows are aligned on ``key_columns`` (by position when not given), so
+    datasets of different shapes can be compared; see ``diff.diff_datasets``.
+    """
     comparison = {
         'shape_diff': df1.shape != df2.shape,
         'shape1': df1.shape,
@@ -33,23 +40,43 @@ def compare_datasets(df1: pd.DataFrame, df2: pd.DataFrame) -> Dict[str, Any]:
         'unique_columns_df2': list(set(df2.columns) - set(df1.columns))
     }
     
-    if df1.shape == df2.shape:
-        comparison['differences'] = (df1 != df2).sum().sum()
-        comparison['difference_matrix'] = df1 != df2
+    diff = diff_datasets(df1, df2, key_columns)
+    comparison.update(diff.summary())
+    comparison['differences'] = comparison['changed_values']
+    comparison['column_changes'] = diff.column_changes()
+    comparison['diff'] = diff
     
     return comparison
 
-def create_line_chart(df: pd.DataFrame, x_col: str, y_col: str, title: str) -> go.Figure:
-    """Create an interactive line chart using Plotly."""
-    fig = px.line(df, x=x_col, y=y_col, title=title)
+@timed()
+def create_line_chart(df: pd.DataFrame, x_col: str, y_col: str, title: str,
+                      downsample: bool = True) -> go.Figure:
+    """Create an interactive line chart using Plotly.
+    
+    Large frames are reduced with LTTB to what the chart width can show and
+    rendered with WebGL above the configured size. Pass ``downsample=False``
+    for exact rendering of every point.
+    """
+    if downsample:
+        df = downsample_line(df[[x_col, y_col]] if x_col != y_col else df[[x_col]], x_col, y_col)
+    fig = px.line(df, x=x_col, y=y_col, title=title, render_mode=render_mode(len(df)))
     fig.update_layout(
         template='plotly_white',
         hovermode='x unified'
     )
     return fig
 
-def create_bar_chart(df: pd.DataFrame, x_col: str, y_col: str, title: str) -> go.Figure:
-    """Create an interactive bar chart using Plotly."""
+@timed()
+def create_bar_chart(df: pd.DataFrame, x_col: str, y_col: str, title: str,
+                     agg: str = 'sum', top_n: int = None) -> go.Figure:
+    """Create an interactive bar chart using Plotly.
+    
+    Rows are reduced per ``x_col`` category with ``agg`` before plotting, so
+    the figure holds one bar per category. Pass ``agg=None`` to plot raw rows.
+    """
+    if agg is not None:
+        df = aggregate_by_category(df, x_col, y_col, agg, top_n)
+        y_col = df.columns[1]
     fig = px.bar(df, x=x_col, y=y_col, title=title)
     fig.update_layout(
         template='plotly_white',
@@ -57,8 +84,18 @@ def create_bar_chart(df: pd.DataFrame, x_col: str, y_col: str, title: str) -> go
     )
     return fig
 
-def create_pie_chart(df: pd.DataFrame, values_col: str, names_col: str, title: str) -> go.Figure:
-    """Create an interactive pie chart using Plotly."""
+@timed()
+def create_pie_chart(df: pd.DataFrame, values_col: str, names_col: str, title: str,
+                     agg: str = 'sum', top_n: int = None) -> go.Figure:
+    """Create an interactive pie chart using Plotly.
+    
+    Rows are reduced per ``names_col`` category with ``agg`` before plotting,
+    so the figure holds one slice per category. Pass ``agg=None`` to plot raw
+    rows.
+    """
+    if agg is not None:
+        df = aggregate_by_category(df, names_col, values_col, agg, top_n)
+        values_col = df.columns[1]
     fig = px.pie(df, values=values_col, names=names_col, title=title)
     fig.update_layout(
         template='plotly_white',
@@ -66,10 +103,34 @@ def create_pie_chart(df: pd.DataFrame, values_col: str, names_col: str, title: s
     )
     return fig
 
-def create_heatmap(df: pd.DataFrame, title: str) -> go.Figure:
-    """Create an interactive heatmap using Plotly."""
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    corr = df[numeric_cols].corr()
+@timed()
+def create_scatter_chart(df: pd.DataFrame, x_col: str, y_col: str, title: str,
+                         color_col: str = None, downsample: bool = True) -> go.Figure:
+    """Create an interactive scatter chart using Plotly.
+    
+    Large frames keep only the min and max point of every pixel-wide x bucket
+    (per color) and render with WebGL above the configured size. Pass
+    ``downsample=False`` for exact rendering of every point.
+    """
+    if downsample:
+        df = downsample_scatter(df, x_col, y_col, color_col=color_col)
+    fig = px.scatter(df, x=x_col, y=y_col, color=color_col, title=title, render_mode=render_mode(len(df)))
+    fig.update_layout(
+        template='plotly_white',
+        hovermode='closest'
+    )
+    return fig
+
+@timed()
+def create_heatmap(df: pd.DataFrame, title: str, method: str = 'pearson',
+                   mask: np.ndarray = None, dataset_key: str = None) -> go.Figure:
+    """Create an interactive correlation heatmap using Plotly.
+    
+    ``mask`` restricts the correlation to a filtered subset of ``df`` without
+    copying it, and the statistics of a whole dataset identified by
+    ``dataset_key`` are computed once and reused.
+    """
+    corr = correlation_matrix(df, method=method, mask=mask, dataset_key=dataset_key)
     fig = px.imshow(corr, title=title)
     fig.update_layout(
         template='plotly_white',
@@ -77,6 +138,7 @@ def create_heatmap(df: pd.DataFrame, title: str) -> go.Figure:
     )
     return fig
 
+@timed()
 def get_download_link(df: pd.DataFrame, filename: str, file_type: str) -> str:
     """Generate a download link for the dataframe."""
     if file_type == 'csv':
@@ -93,15 +155,15 @@ def get_download_link(df: pd.DataFrame, filename: str, file_type: str) -> str:
     
     return f'<a href="{href}" download="{filename}.{file_type}">Download {file_type.upper()} file</a>'
 
-def apply_filters(df: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
-    """Apply filters to the dataframe."""
-    filtered_df = df.copy()
-    
-    for column, value in filters.items():
-        if value is not None and value != '':
-            if isinstance(value, (list, tuple)):
-                filtered_df = filtered_df[filtered_df[column].isin(value)]
-            else:
-                filtered_df = filtered_df[filtered_df[column] == value]
+@timed()
+def apply_filters(df: pd.DataFrame, filters: Dict[str, Any], dataset_key: str = None,
+                  value_index: Dict[str, Any] = None) -> pd.DataFrame:
+    """Apply filters to the dataframe.
     
-    return filtered_df 
\ No newline at end of file
+    Values may be a list of allowed values, a single value or a
+    {'min': ..., 'max': ...} range. All predicates are combined into one mask
+    and the result is materialized once. Passing the ``dataset_key`` of an
+    unmodified cached dataset reuses per-column masks across reruns, and its
+    ``value_index`` answers list filters from precomputed row positions.
+    """
+    return filter_frame(df, filters, dataset_key, value_index) 
\ No newline at end of file
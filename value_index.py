@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import FILTER_SETTINGS
+from dtypes import is_categorical_column
+
+
+class ColumnIndex:
+    """Sorted distinct values of a column with their counts and row positions.
+
+    Row positions are stored CSR-style: the positions of the rows holding
+    ``values[i]`` are ``order[offsets[i]:offsets[i + 1]]``.
+    """
+
+    def __init__(self, series: pd.Series):
+        try:
+            codes, uniques = pd.factorize(series, sort=True)
+        except TypeError:
+            # Mixed types that cannot be ordered keep their first-seen order
+            codes, uniques = pd.factorize(series)
+        position_dtype = np.int32 if len(series) < np.iinfo(np.int32).max else np.int64
+        self.n_rows = len(series)
+        self.values = list(uniques)
+        self.counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self.null_count = int((codes < 0).sum())
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)])
+        # Null rows (code -1) sort first and are kept apart from the value positions
+        order = np.argsort(codes, kind='stable').astype(position_dtype)
+        self.null_positions = order[:self.null_count]
+        self.order = order[self.null_count:]
+        self._lookup = {value: i for i, value in enumerate(self.values)}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return self.order.nbytes + self.null_positions.nbytes + self.counts.nbytes + self.offsets.nbytes
+
+    def positions(self, value) -> np.ndarray:
+        """Return the row positions holding ``value``."""
+        i = self._lookup.get(value)
+        if i is None:
+            return self.order[:0]
+        return self.order[self.offsets[i]:self.offsets[i + 1]]
+
+    def isin_mask(self, values: Iterable) -> Optional[np.ndarray]:
+        """Return the mask of rows holding any of ``values``, None if that is every row."""
+        selected = np.zeros(len(self.values), dtype=bool)
+        for value in values:
+            i = self._lookup.get(value)
+            if i is not None:
+                selected[i] = True
+        if selected.all() and not self.null_count:
+            return None
+
+        # Scatter whichever side touches fewer rows
+        if self.counts[selected].sum() <= self.n_rows // 2:
+            mask = np.zeros(self.n_rows, dtype=bool)
+            for i in np.flatnonzero(selected):
+                mask[self.order[self.offsets[i]:self.offsets[i + 1]]] = True
+        else:
+            mask = np.ones(self.n_rows, dtype=bool)
+            for i in np.flatnonzero(~selected):
+                mask[self.order[self.offsets[i]:self.offsets[i + 1]]] = False
+            mask[self.null_positions] = False
+        return mask
+
+    def search(self, text: str, limit: int) -> List:
+        """Return up to ``limit`` values containing ``text``, most frequent first."""
+        text = text.strip().lower()
+        matches = [i for i, value in enumerate(self.values) if text in str(value).lower()]
+        matches.sort(key=lambda i: -self.counts[i])
+        return [self.values[i] for i in matches[:limit]]
+
+
+def build_value_index(df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, ColumnIndex]:
+    """Index the text-like columns of a dataframe (or the given columns)."""
+    if columns is None:
+        columns = [column for column in df.columns if is_categorical_column(df[column])]
+    return {column: ColumnIndex(df[column]) for column in columns}
+
+
+_indexes: "OrderedDict[str, Dict[str, ColumnIndex]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_value_index(df: pd.DataFrame, dataset_key: str) -> Dict[str, ColumnIndex]:
+    """Return the value index of a dataset, building it once per dataset key."""
+    with _lock:
+        if dataset_key in _indexes:
+            _indexes.move_to_end(dataset_key)
+            return _indexes[dataset_key]
+
+    index = build_value_index(df)
+    with _lock:
+        _indexes[dataset_key] = index
+        while len(_indexes) > FILTER_SETTINGS["value_index_entries"]:
+            _indexes.popitem(last=False)
+    return index
+
+
+def invalidate_index(dataset_key: str) -> None:
+    """Drop the index of a dataset that is no longer cached."""
+    with _lock:
+        _indexes.pop(dataset_key, None)
@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import VIEWER_SETTINGS
+
+
+class SortIndex:
+    """Row positions of a column in sorted order, with missing values last.
+
+    Computed once per dataset column and direction; any filtered subset is
+    put in order by keeping the positions its mask selects, without sorting
+    again.
+    """
+
+    def __init__(self, series: pd.Series):
+        self.series = series.reset_index(drop=True)
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def order(self, ascending: bool = True) -> np.ndarray:
+        with self._lock:
+            if ascending not in self._orders:
+                # A stable sort in each direction keeps ties in row order, as sort_values does
+                ordered = self.series.sort_values(ascending=ascending, kind='stable', na_position='last')
+                self._orders[ascending] = ordered.index.to_numpy()
+            return self._orders[ascending]
+
+    def positions(self, mask: Optional[np.ndarray] = None, ascending: bool = True) -> np.ndarray:
+        """Return the sorted positions of the rows in ``mask`` (all rows when None)."""
+        order = self.order(ascending)
+        return order if mask is None else order[mask[order]]
+
+
+_sort_indexes: "OrderedDict[Tuple[str, str], SortIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_sort_index(df: pd.DataFrame, dataset_key: str, column: str) -> SortIndex:
+    """Return the sort index of a dataset column, building it on first use."""
+    cache_key = (dataset_key, column)
+    with _lock:
+        index = _sort_indexes.get(cache_key)
+        if index is not None:
+            _sort_indexes.move_to_end(cache_key)
+            return index
+
+    index = SortIndex(df[column])
+    with _lock:
+        _sort_indexes[cache_key] = index
+        while len(_sort_indexes) > VIEWER_SETTINGS["sort_index_entries"]:
+            _sort_indexes.popitem(last=False)
+    return index
+
+
+def invalidate_sort_index(dataset_key: str) -> None:
+    """Drop the sort indexes of a dataset that is no longer cached."""
+    with _lock:
+        for cache_key in [cache_key for cache_key in _sort_indexes if cache_key[0] == dataset_key]:
+            del _sort_indexes[cache_key]
+
+
+def page(df: pd.DataFrame, dataset_key: str, mask: Optional[np.ndarray] = None, page_number: int = 0,
+         page_size: Optional[int] = None, sort_column: Optional[str] = None, ascending: bool = True,
+         columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, int]:
+    """Return one page of the (filtered, sorted) rows of ``df`` and the total row count.
+
+    ``mask`` selects the filtered rows of the full frame. Only the page's
+    rows and ``columns`` are materialized, so the payload sent to the
+    browser does not grow with the dataset.
+    """
+    if page_size is None:
+        page_size = VIEWER_SETTINGS["page_sizes"][0]
+    if sort_column is not None:
+        positions = get_sort_index(df, dataset_key, sort_column).positions(mask, ascending)
+    elif mask is not None:
+        positions = np.flatnonzero(mask)
+    else:
+        positions = None
+
+    total = len(df) if positions is None else len(positions)
+    start = page_number * page_size
+    end = min(start + page_size, total)
+    window = np.arange(start, end) if positions is None else positions[start:end]
+
+    column_positions = slice(None) if columns is None else df.columns.get_indexer(columns)
+    return df.iloc[window, column_positions], total